@@ -0,0 +1,197 @@
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class BatchUnit:
+    """
+    Insights row of a campaign/adset, either a total or a single day.
+    """
+    cpl: float
+    cpm: float
+    day: str | None = None
+    impressions: int = 0
+    spent: float = 0.0
+    ctr: float = 0.0
+
+
+@dataclass(slots=True)
+class DaySeries:
+    """
+    Array-backed by-day insights of a campaign/adset.
+    """
+    days: list[str] = field(default_factory=list)
+    cpl: array = field(default_factory=lambda: array('d'))
+    cpm: array = field(default_factory=lambda: array('d'))
+    impressions: array = field(default_factory=lambda: array('q'))
+    spent: array = field(default_factory=lambda: array('d'))
+    ctr: array = field(default_factory=lambda: array('d'))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __iter__(self):
+        for index, day in enumerate(self.days):
+            yield BatchUnit(
+                cpl=self.cpl[index],
+                cpm=self.cpm[index],
+                day=day,
+                impressions=self.impressions[index],
+                spent=self.spent[index],
+                ctr=self.ctr[index],
+            )
+
+    def append(self, unit: BatchUnit) -> None:
+        """
+        Append a day of insights.
+
+        Args:
+            unit (BatchUnit): Insights of a single day.
+        """
+        self.days.append(sys.intern(unit.day) if unit.day else unit.day)
+        self.cpl.append(unit.cpl)
+        self.cpm.append(unit.cpm)
+        self.impressions.append(unit.impressions)
+        self.spent.append(unit.spent)
+        self.ctr.append(unit.ctr)
+
+    def to_list(self) -> list[dict]:
+        """
+        Serialize by-day insights.
+
+        Returns:
+            List[Dict[str, any]]: By-day insights in the API response format.
+        """
+        return [
+            {
+                "cpl": unit.cpl,
+                "cpm": unit.cpm,
+                "day": unit.day,
+                "impressions": unit.impressions,
+                "spent": unit.spent,
+                "ctr": unit.ctr,
+            }
+            for unit in self
+        ]
+
+
+@dataclass(slots=True)
+class ModeStats:
+    """
+    Statistics of a campaign/adset.
+    """
+    id: str
+    name: str
+    status: str
+    cpm: float
+    cpl: float
+    ctr: Any
+    impressions: Any
+    spent: float
+    date_from: str
+    date_to: str
+    by_day: DaySeries = field(default_factory=DaySeries)
+
+    def update_totals(self, unit: BatchUnit) -> None:
+        """
+        Update cost metrics with insights totals.
+
+        Args:
+            unit (BatchUnit): Insights totals of the campaign/adset.
+        """
+        self.cpl = unit.cpl
+        self.cpm = unit.cpm
+
+    def to_dict(self) -> dict:
+        """
+        Serialize campaign/adset statistics.
+
+        Returns:
+            Dict[str, any]: Statistics in the API response format.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "cpm": self.cpm,
+            "cpl": self.cpl,
+            "ctr": self.ctr,
+            "impressions": self.impressions,
+            "spent": self.spent,
+            "date_from": self.date_from,
+            "date_to": self.date_to,
+            "by_day": self.by_day.to_list(),
+        }
+
+
+@dataclass(slots=True)
+class LeadStats:
+    """
+    Statistics of an ad account.
+    """
+    id: str
+    name: str
+    currency: str
+    adtrust_dsl: Any
+    credit_card: list
+    data: dict[str, ModeStats] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """
+        Serialize ad account statistics.
+
+        Returns:
+            Dict[str, any]: Statistics in the API response format.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "currency": self.currency,
+            "adtrust_dsl": self.adtrust_dsl,
+            "credit_card": self.credit_card,
+            "data": [mode_stats.to_dict() for mode_stats in self.data.values()] if self.data else dict(),
+        }
+
+
+@dataclass(slots=True)
+class RollupTotals:
+    """
+    Additive totals of insights rows, from which weighted ratios are derived.
+    """
+    spent: float = 0.0
+    impressions: int = 0
+    clicks: float = 0.0
+    leads: float = 0.0
+
+    def add(self, spent: float, impressions: int, ctr: float, leads: float) -> None:
+        """
+        Add an insights row to the totals.
+
+        Args:
+            spent (float): Spent amount.
+            impressions (int): Number of impressions.
+            ctr (float): Click-through rate in percents.
+            leads (float): Number of leads.
+        """
+        self.spent += spent
+        self.impressions += impressions
+        self.clicks += impressions * ctr / 100
+        self.leads += leads
+
+    def to_dict(self) -> dict:
+        """
+        Serialize totals together with impression/lead weighted ratios.
+
+        Returns:
+            Dict[str, float]: Totals and ratios.
+        """
+        return {
+            "spent": round(self.spent, 2),
+            "impressions": self.impressions,
+            "leads": round(self.leads),
+            "cpm": round(self.spent * 1000 / self.impressions, 2) if self.impressions else 0,
+            "ctr": round(self.clicks * 100 / self.impressions, 2) if self.impressions else 0,
+            "cpl": round(self.spent / self.leads, 2) if self.leads else 0,
+        }
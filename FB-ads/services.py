@@ -5,8 +5,22 @@ import re
 import requests
 
 from ad_creation_api.exceptions import AdCreationError, AcceptPolicyError, AdStatsError
+from collections import defaultdict
+
+from ad_creation_api.records import BatchUnit, LeadStats, ModeStats, RollupTotals
 import http.client
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 http.client._MAXHEADERS = 1000
 
 
@@ -449,7 +463,7 @@ class AdStatisticService:
         return round(spent * 0.01, 2)
 
     @classmethod
-    def format_mode_data(cls, mode_object: dict, date_to: str, date_from: str) -> dict:
+    def format_mode_data(cls, mode_object: dict, date_to: str, date_from: str) -> ModeStats:
         """
         Format adset/campaign data.
 
@@ -459,25 +473,24 @@ class AdStatisticService:
             date_from (str): Start date of the mode.
 
         Returns:
-            Dict[str, any]: Formatted mode information.
-        """
-        mode_info = {
-            "id": mode_object.get("id"),
-            "name": mode_object.get("name"),
-            "status": mode_object.get("status"),
-            "cpm": mode_object.get("cpm", 0),
-            "cpl": mode_object.get("cpl", 0),
-            "ctr": mode_object.get("ctr"),
-            "impressions": mode_object.get("impressions"),
-            "spent": cls.format_spent(int(mode_object.get("spent"))),
-            "date_from": date_from,
-            "date_to": date_to,
-            'by_day': []
-        }
+            ModeStats: Formatted mode information.
+        """
+        mode_info = ModeStats(
+            id=mode_object.get("id"),
+            name=mode_object.get("name"),
+            status=mode_object.get("status"),
+            cpm=mode_object.get("cpm", 0),
+            cpl=mode_object.get("cpl", 0),
+            ctr=mode_object.get("ctr"),
+            impressions=mode_object.get("impressions"),
+            spent=cls.format_spent(int(mode_object.get("spent"))),
+            date_from=date_from,
+            date_to=date_to,
+        )
         return mode_info
 
     @classmethod
-    def format_lead_data(cls, lead_data: dict) -> dict:
+    def format_lead_data(cls, lead_data: dict) -> LeadStats:
         """
         Format lead data.
 
@@ -485,19 +498,18 @@ class AdStatisticService:
             lead_data (Dict[str, any]): Lead data containing lead information.
 
         Returns:
-            Dict[str, any]: Formatted lead information.
+            LeadStats: Formatted lead information.
         """
         payment_methods = []
         if lead_data.get("all_payment_methods"):
             payment_methods = lead_data.get("all_payment_methods").get("pm_credit_card").get('data')
-        lead_info = {
-            "id": lead_data.get('id'),
-            "name": lead_data.get("name"),
-            "currency": lead_data.get("currency"),
-            "adtrust_dsl": lead_data.get("adtrust_dsl"),
-            "credit_card": payment_methods,
-            'data': dict()
-        }
+        lead_info = LeadStats(
+            id=lead_data.get('id'),
+            name=lead_data.get("name"),
+            currency=lead_data.get("currency"),
+            adtrust_dsl=lead_data.get("adtrust_dsl"),
+            credit_card=payment_methods,
+        )
         return lead_info
 
     @classmethod
@@ -544,9 +556,20 @@ class AdStatisticService:
         return batch_request
 
     @classmethod
-    def run_batch_request(cls, batch_body: list, access_token: str, cookies: dict, proxies: dict, headers: dict) -> list:
+    def iter_batch_response(
+            cls,
+            batch_body: list,
+            access_token: str,
+            cookies: dict,
+            proxies: dict,
+            headers: dict,
+            raise_for_status: bool = False
+    ):
         """
-        Execute batch request.
+        Execute batch request and decode sub-responses one at a time.
+
+        The response is streamed from the socket and parsed incrementally when `ijson` is installed,
+        so only the sub-response being processed is held in memory.
 
         Args:
             batch_body (List[Dict[str, str]]): Batch request body.
@@ -554,9 +577,14 @@ class AdStatisticService:
             cookies (Dict[str, str]): Cookies for authentication.
             proxies (Dict[str, str]): Proxies for making the request.
             headers (Dict[str, str]): Headers for the request.
+            raise_for_status (bool): Whether to raise on an unsuccessful batch response
+                instead of yielding nothing.
 
-        Returns:
-            List[Dict[str, str]]: Batch response data.
+        Yields:
+            Dict[str, any]: Decoded body of each sub-response.
+
+        Raises:
+            AdStatsError: If any sub-response, or the batch response with `raise_for_status`, is not successful.
         """
         batch_response = requests.post(
             url='https://graph.facebook.com/v18.0/',
@@ -564,18 +592,46 @@ class AdStatisticService:
             json={"batch": batch_body, "access_token": access_token},
             proxies=proxies,
             headers=headers,
+            stream=True,
         )
-        batch_response_data = []
-        if batch_response.status_code == 200:
-            for response in batch_response.json():
+        if batch_response.status_code != 200:
+            batch_response.close()
+            if raise_for_status:
+                raise AdStatsError('Failed to make request')
+            return
+
+        with batch_response:
+            if ijson:
+                batch_response.raw.decode_content = True
+                responses = ijson.items(batch_response.raw, 'item')
+            else:
+                responses = batch_response.json()
+
+            for response in responses:
                 if response.get('code') == 200:
-                    batch_response_data.append(json.loads(response.get('body')))
+                    yield json_loads(response.get('body'))
                 else:
                     raise AdStatsError("response from FB:" + str(response.get('body')))
-        return batch_response_data
 
     @classmethod
-    def format_batch_unit(cls, mode_data: dict, by_day: bool) -> dict:
+    def run_batch_request(cls, batch_body: list, access_token: str, cookies: dict, proxies: dict, headers: dict) -> list:
+        """
+        Execute batch request.
+
+        Args:
+            batch_body (List[Dict[str, str]]): Batch request body.
+            access_token (str): Access token for authentication.
+            cookies (Dict[str, str]): Cookies for authentication.
+            proxies (Dict[str, str]): Proxies for making the request.
+            headers (Dict[str, str]): Headers for the request.
+
+        Returns:
+            List[Dict[str, str]]: Batch response data.
+        """
+        return list(cls.iter_batch_response(batch_body, access_token, cookies, proxies, headers))
+
+    @classmethod
+    def format_batch_unit(cls, mode_data: dict, by_day: bool) -> BatchUnit:
         """
         Format batch unit data.
 
@@ -584,7 +640,7 @@ class AdStatisticService:
             by_day (bool): Flag indicating whether data is by day.
 
         Returns:
-            dict: Formatted batch unit data.
+            BatchUnit: Formatted batch unit data.
         """
         cpl = 0
         cost_per_result = mode_data.get('cost_per_result')
@@ -592,19 +648,15 @@ class AdStatisticService:
             if cost_per_result[0].get('values'):
                 cpl = cost_per_result[0].get('values')[0].get('value')
 
-        batch_unit_data = {
-            "cpl": round(float(cpl), 2),
-            "cpm": round(float(mode_data.get('cpm', 0)), 2),
-        }
+        batch_unit_data = BatchUnit(
+            cpl=round(float(cpl), 2),
+            cpm=round(float(mode_data.get('cpm', 0)), 2),
+        )
         if by_day:
-            batch_unit_data.update(
-                {
-                    "day": mode_data.get('date_start'),
-                    "impressions": int(mode_data.get('impressions', 0)),
-                    "spent": float(mode_data.get('spend', 0)),
-                    "ctr": float(mode_data.get('ctr', 0)),
-                }
-            )
+            batch_unit_data.day = mode_data.get('date_start')
+            batch_unit_data.impressions = int(mode_data.get('impressions', 0))
+            batch_unit_data.spent = float(mode_data.get('spend', 0))
+            batch_unit_data.ctr = float(mode_data.get('ctr', 0))
         return batch_unit_data
 
     @classmethod
@@ -613,16 +665,55 @@ class AdStatisticService:
         Format statistics data.
 
         Args:
-            stats_data (list): List of statistics data.
+            stats_data (List[LeadStats]): List of statistics data.
 
         Returns:
             list: Formatted statistics data.
         """
-        for lead_data in stats_data:
-            if lead_data.get('data'):
-                lead_data['data'] = [unit_dict for unit_dict in lead_data.get('data').values()]
+        return [cls.format_lead_stats(lead_data) for lead_data in stats_data]
 
-        return stats_data
+    @classmethod
+    def format_lead_stats(cls, lead_data: LeadStats) -> dict:
+        """
+        Format statistics data of a single lead.
+
+        Args:
+            lead_data (LeadStats): Statistics data of the lead.
+
+        Returns:
+            dict: Formatted statistics data of the lead.
+        """
+        return lead_data.to_dict()
+
+    @classmethod
+    def update_lead_stats(cls, batch_unit: dict, lead_stats: LeadStats, mode: str, by_day: bool) -> LeadStats:
+        """
+        Update statistics of a single lead with one batch unit.
+
+        Args:
+            batch_unit (dict): Decoded batch sub-response.
+            lead_stats (LeadStats): Statistics data of the lead.
+            mode (str): Mode string.
+            by_day (bool): Flag indicating whether data is by day.
+
+        Returns:
+            LeadStats: Updated statistics data of the lead.
+        """
+        mode_type = {
+            'campaigns': "campaign",
+            'adsets': "adset",
+        }
+        if not batch_unit.get('data'):
+            return lead_stats
+        for mode_data in batch_unit.get('data'):
+            batch_unit_data = cls.format_batch_unit(mode_data, by_day)
+            stats_unit = lead_stats.data.get(mode_data.get(f'{mode_type[mode]}_id'))
+            if stats_unit:
+                if not by_day:
+                    stats_unit.update_totals(batch_unit_data)
+                else:
+                    stats_unit.by_day.append(batch_unit_data)
+        return lead_stats
 
     @classmethod
     def update_stats_unit(cls, batch_data: list, stats_data: list, mode: str, by_day: bool) -> list:
@@ -638,21 +729,8 @@ class AdStatisticService:
         Returns:
             list: Updated statistics data.
         """
-        mode_type = {
-            'campaigns': "campaign",
-            'adsets': "adset",
-        }
         for index, batch_unit in enumerate(batch_data):
-            if not batch_unit.get('data'):
-                continue
-            for mode_data in batch_unit.get('data'):
-                batch_unit_dict = cls.format_batch_unit(mode_data, by_day)
-                stats_unit = stats_data[index]['data'].get(mode_data.get(f'{mode_type[mode]}_id'))
-                if stats_unit:
-                    if not by_day:
-                        stats_unit.update(batch_unit_dict)
-                    else:
-                        stats_unit['by_day'].append(batch_unit_dict)
+            cls.update_lead_stats(batch_unit, stats_data[index], mode, by_day)
         return stats_data
 
     @classmethod
@@ -677,6 +755,54 @@ class AdStatisticService:
 
         return cls.format_stats_data(stats_data)
 
+    @classmethod
+    def iter_lead_stats(cls, batch_units, stats_data: list, mode: str, by_day: bool):
+        """
+        Unit streamed batch units with stats data and yield every lead as soon as it is complete.
+
+        Batch units arrive in the order of `create_batch_request`: for every lead the by-day
+        insights (if requested) followed by the total insights. Entries of `stats_data` are
+        released once yielded, so memory stays flat in the number of leads.
+
+        Args:
+            batch_units (Iterable[dict]): Decoded batch sub-responses.
+            stats_data (list): List of statistics data.
+            mode (str): Mode string.
+            by_day (bool): Flag indicating whether data is by day.
+
+        Yields:
+            dict: Formatted statistics data of a lead.
+        """
+        step = 2 if by_day else 1
+        completed = 0
+        for index, batch_unit in enumerate(batch_units):
+            lead_index, position = divmod(index, step)
+            cls.update_lead_stats(batch_unit, stats_data[lead_index], mode, by_day and position == 0)
+            if position == step - 1:
+                completed = lead_index + 1
+                lead_data, stats_data[lead_index] = stats_data[lead_index], None
+                yield cls.format_lead_stats(lead_data)
+
+        for lead_index in range(completed, len(stats_data)):
+            lead_data, stats_data[lead_index] = stats_data[lead_index], None
+            yield cls.format_lead_stats(lead_data)
+
+    @classmethod
+    def unit_stream_data(cls, batch_units, stats_data: list, mode: str, by_day: bool) -> list:
+        """
+        Unit streamed batch units with stats data as they are decoded.
+
+        Args:
+            batch_units (Iterable[dict]): Decoded batch sub-responses.
+            stats_data (list): List of statistics data.
+            mode (str): Mode string.
+            by_day (bool): Flag indicating whether data is by day.
+
+        Returns:
+            list: Formatted statistics data.
+        """
+        return list(cls.iter_lead_stats(batch_units, stats_data, mode, by_day))
+
     @classmethod
     def parce_stats_response(cls, response_data: dict, mode: str, time_range: dict, by_day: bool) -> tuple[list, list]:
         """
@@ -695,38 +821,151 @@ class AdStatisticService:
         batch_request = []
         for lead_data in response_data.get('data'):
             lead_info = cls.format_lead_data(lead_data)
-            batch_request.extend(cls.create_batch_request(lead_info.get('id'), mode, time_range, by_day))
+            batch_request.extend(cls.create_batch_request(lead_info.id, mode, time_range, by_day))
             if lead_data.get(mode):
                 for mode_object in lead_data.get(mode).get('data'):
                     mode_info = cls.format_mode_data(mode_object, time_range.get('until'), time_range.get('since'))
 
-                    lead_info['data'][mode_info.get('id')] = mode_info
+                    lead_info.data[mode_info.id] = mode_info
             result_list.append(lead_info)
         return result_list, batch_request
 
     @classmethod
-    def get_ad_stats(
+    def get_account_stats(
             cls,
-            by_day: bool,
+            account_data: dict,
             mode: str,
-            date_from: datetime.date,
-            date_to: datetime.date,
-            lead_creds: dict
-    ) -> list:
+            time_range: str,
+            by_day: bool,
+            access_token: str,
+            cookies: dict,
+            proxies: dict,
+            headers: dict
+    ) -> dict:
         """
-        Get FB advertisement statistics.
+        Get FB advertisement statistics of a single ad account.
 
         Args:
-            by_day (bool): Flag indicating whether data is by day.
+            account_data (dict): Ad account data as returned by `get_ad_accounts`.
             mode (str): adsets/campaigns.
-            date_from (datetime.date): Start date of the time range.
-            date_to (datetime.date): End date of the time range.
+            time_range (str): JSON encoded time range.
+            by_day (bool): Flag indicating whether data is by day.
+            access_token (str): Access token for authentication.
+            cookies (Dict[str, str]): Cookies for authentication.
+            proxies (Dict[str, str]): Proxies for making the request.
+            headers (Dict[str, str]): Headers for the request.
+
+        Returns:
+            dict: Advertisement statistics of the ad account.
+
+        Raises:
+            AdStatsError: If the batch request is not successful.
+        """
+        mode_objects_data, batch_body = cls.parce_stats_response(
+            {'data': [account_data]}, mode, json.loads(time_range), by_day
+        )
+        batch_units = cls.iter_batch_response(
+            batch_body, access_token, cookies, proxies, headers, raise_for_status=True
+        )
+        return cls.unit_stream_data(batch_units, mode_objects_data, mode, by_day)[0]
+
+    @classmethod
+    def convert_currency(cls, amount: float, currency: str, rates: dict[str, float] | None) -> float:
+        """
+        Convert amount to the rollup currency.
+
+        Args:
+            amount (float): Amount in the ad account currency.
+            currency (str): Ad account currency.
+            rates (Dict[str, float], optional): Rates of account currencies to the rollup currency.
+
+        Returns:
+            float: Converted amount, or the original amount if no rates are given.
+
+        Raises:
+            AdStatsError: If there is no rate for the currency.
+        """
+        if rates is None:
+            return amount
+        if currency not in rates:
+            raise AdStatsError(f"No exchange rate for {currency}")
+        return amount * rates[currency]
+
+    @classmethod
+    def rollup_stats(cls, stats: list, rates: dict[str, float] | None = None, currency: str | None = None) -> dict:
+        """
+        Roll up advertisement statistics per ad account, per currency and per day in a single pass.
+
+        Account and currency totals are kept in the ad account currency. Daily totals and the
+        portfolio total are normalized to `currency` when `rates` are given, otherwise daily totals
+        are grouped by ad account currency and there is no portfolio total.
+
+        Args:
+            stats (list): Advertisement statistics as returned by `get_ad_stats`.
+            rates (Dict[str, float], optional): Rates of account currencies to `currency`.
+            currency (str, optional): Currency to normalize to.
+
+        Returns:
+            dict: Totals with weighted cpm, ctr and cpl under 'accounts', 'currencies', 'days' and 'total'.
+
+        Raises:
+            AdStatsError: If there is no rate for an ad account currency.
+        """
+        accounts = defaultdict(RollupTotals)
+        currencies = defaultdict(RollupTotals)
+        days = defaultdict(lambda: defaultdict(RollupTotals))
+        total = RollupTotals()
+        account_currencies = dict()
+
+        for lead_data in stats:
+            lead_currency = lead_data.get('currency')
+            account_currencies[lead_data.get('id')] = lead_currency
+            # Keep ad accounts without campaigns or adsets in the rollup with zero totals.
+            account_totals = accounts[lead_data.get('id')]
+            day_currency = currency if rates is not None else lead_currency
+            for mode_info in lead_data.get('data') or []:
+                spent = mode_info.get('spent') or 0
+                impressions = int(mode_info.get('impressions') or 0)
+                ctr = float(mode_info.get('ctr') or 0)
+                leads = spent / mode_info.get('cpl') if mode_info.get('cpl') else 0
+                account_totals.add(spent, impressions, ctr, leads)
+                currencies[lead_currency].add(spent, impressions, ctr, leads)
+                if rates is not None:
+                    total.add(cls.convert_currency(spent, lead_currency, rates), impressions, ctr, leads)
+
+                for day_info in mode_info.get('by_day'):
+                    day_leads = day_info.get('spent') / day_info.get('cpl') if day_info.get('cpl') else 0
+                    days[day_currency][day_info.get('day')].add(
+                        cls.convert_currency(day_info.get('spent'), lead_currency, rates),
+                        day_info.get('impressions'),
+                        day_info.get('ctr'),
+                        day_leads,
+                    )
+
+        return {
+            'accounts': {
+                account_id: {**totals.to_dict(), 'currency': account_currencies[account_id]}
+                for account_id, totals in accounts.items()
+            },
+            'currencies': {currency_code: totals.to_dict() for currency_code, totals in currencies.items()},
+            'days': {
+                currency_code: {day: totals.to_dict() for day, totals in sorted(day_totals.items())}
+                for currency_code, day_totals in days.items()
+            },
+            'total': {**total.to_dict(), 'currency': currency} if rates is not None else None,
+        }
+
+    @classmethod
+    def get_request_params(cls, lead_creds: dict) -> tuple[str, dict, dict, dict]:
+        """
+        Get access token, cookies, proxies and headers for Graph API requests of a lead.
+
+        Args:
             lead_creds (dict): Dictionary containing lead credentials.
 
         Returns:
-            list: Advertisement statistics.
+            tuple: Tuple containing access token, cookies, proxies and headers.
         """
-        ad_stats_url = 'https://graph.facebook.com/v18.0/me/adaccounts?'
         cookies = cls.get_cookies(lead_creds.get('cookies'))
         headers = {
             "User-Agent": lead_creds.get('user_agent')
@@ -739,7 +978,36 @@ class AdStatisticService:
         else:
             proxies = {}
         access_token, _ = AdCreationService.get_eaab_token(headers=headers, cookies=cookies, proxies=proxies)
-        time_range = json.dumps({'since': str(date_from), 'until': str(date_to)})
+        return access_token, cookies, proxies, headers
+
+    @classmethod
+    def get_ad_accounts(
+            cls,
+            mode: str,
+            time_range: str,
+            access_token: str,
+            cookies: dict,
+            proxies: dict,
+            headers: dict
+    ) -> dict:
+        """
+        Get ad accounts of a lead together with their campaigns/adsets.
+
+        Args:
+            mode (str): adsets/campaigns.
+            time_range (str): JSON encoded time range.
+            access_token (str): Access token for authentication.
+            cookies (Dict[str, str]): Cookies for authentication.
+            proxies (Dict[str, str]): Proxies for making the request.
+            headers (Dict[str, str]): Headers for the request.
+
+        Returns:
+            dict: Ad accounts response data.
+
+        Raises:
+            AdStatsError: If failed to get ad accounts.
+        """
+        ad_stats_url = 'https://graph.facebook.com/v18.0/me/adaccounts?'
         params = {
             'limit': 500,
             'fields': (
@@ -761,11 +1029,59 @@ class AdStatisticService:
             proxies=proxies,
             headers=headers
         )
-        mode_objects_data, batch_body = cls.parce_stats_response(response.json(), mode, json.loads(time_range), by_day)
-        batch_info = cls.run_batch_request(batch_body, access_token, cookies, proxies, headers)
-        stats = cls.unit_data(batch_info, mode_objects_data, mode, by_day)
-
-        if response.status_code == 200:
-            return stats
-        else:
+        if response.status_code != 200:
             raise AdStatsError('Failed to make request')
+        return response.json()
+
+    @classmethod
+    def iter_ad_stats(
+            cls,
+            by_day: bool,
+            mode: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            lead_creds: dict
+    ):
+        """
+        Get FB advertisement statistics lead by lead.
+
+        Args:
+            by_day (bool): Flag indicating whether data is by day.
+            mode (str): adsets/campaigns.
+            date_from (datetime.date): Start date of the time range.
+            date_to (datetime.date): End date of the time range.
+            lead_creds (dict): Dictionary containing lead credentials.
+
+        Yields:
+            dict: Advertisement statistics of a single ad account.
+        """
+        access_token, cookies, proxies, headers = cls.get_request_params(lead_creds)
+        time_range = json.dumps({'since': str(date_from), 'until': str(date_to)})
+        response_data = cls.get_ad_accounts(mode, time_range, access_token, cookies, proxies, headers)
+        mode_objects_data, batch_body = cls.parce_stats_response(response_data, mode, json.loads(time_range), by_day)
+        batch_units = cls.iter_batch_response(batch_body, access_token, cookies, proxies, headers)
+        yield from cls.iter_lead_stats(batch_units, mode_objects_data, mode, by_day)
+
+    @classmethod
+    def get_ad_stats(
+            cls,
+            by_day: bool,
+            mode: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            lead_creds: dict
+    ) -> list:
+        """
+        Get FB advertisement statistics.
+
+        Args:
+            by_day (bool): Flag indicating whether data is by day.
+            mode (str): adsets/campaigns.
+            date_from (datetime.date): Start date of the time range.
+            date_to (datetime.date): End date of the time range.
+            lead_creds (dict): Dictionary containing lead credentials.
+
+        Returns:
+            list: Advertisement statistics.
+        """
+        return list(cls.iter_ad_stats(by_day, mode, date_from, date_to, lead_creds))
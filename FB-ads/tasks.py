@@ -0,0 +1,145 @@
+import datetime
+import json
+
+from celery import chord, group
+from django.core.cache import cache
+
+from ad_creation_api.exceptions import AdStatsError
+from ad_creation_api.services import AdStatisticService
+
+
+AD_STATS_CACHE_KEY = 'ad_stats:{lead_id}:{mode}:{by_day}'
+AD_STATS_CREDS_KEY = 'ad_stats_creds:{lead_id}'
+AD_STATS_PARAMS_KEY = 'ad_stats_params:{lead_id}'
+AD_STATS_CREDS_TIMEOUT = 60 * 60
+
+
+def get_ad_stats_cache_key(lead_id: int, mode: str, by_day: bool) -> str:
+    """
+    Get the cache key under which refreshed stats of a lead are stored.
+
+    Args:
+        lead_id (int): The ID of the lead.
+        mode (str): adsets/campaigns.
+        by_day (bool): Flag indicating whether data is by day.
+
+    Returns:
+        str: The cache key.
+    """
+    return AD_STATS_CACHE_KEY.format(lead_id=lead_id, mode=mode, by_day=int(by_day))
+
+
+def store_lead_creds(lead_id: int, lead_creds: dict) -> None:
+    """
+    Store credentials of a lead for `refresh_ad_stats`, call it before enqueueing the task.
+
+    Credentials are kept in the cache for `AD_STATS_CREDS_TIMEOUT` rather than passed to
+    tasks, so they never end up in broker messages.
+
+    Args:
+        lead_id (int): The ID of the lead.
+        lead_creds (dict): Dictionary containing lead credentials.
+    """
+    cache.set(AD_STATS_CREDS_KEY.format(lead_id=lead_id), lead_creds, AD_STATS_CREDS_TIMEOUT)
+
+
+def get_lead_cache(key: str, lead_id: int):
+    """
+    Get a cached value of a lead stored for the ad stats refresh.
+
+    Args:
+        key (str): The cache key template.
+        lead_id (int): The ID of the lead.
+
+    Returns:
+        Any: The cached value.
+
+    Raises:
+        KeyError: If the value expired.
+    """
+    value = cache.get(key.format(lead_id=lead_id))
+    if value is None:
+        raise KeyError(f'Ad stats request data of lead {lead_id} expired')
+    return value
+
+
+@app.task(autoretry_for=(AdStatsError,), retry_backoff=True, retry_kwargs={'max_retries': 5})
+def refresh_ad_stats(
+        lead_id: int,
+        mode: str = 'campaigns',
+        by_day: bool = False,
+        date_from: str = None,
+        date_to: str = None
+) -> str:
+    """
+    Task to refresh FB advertisement statistics of a lead, fanning out one subtask per ad account.
+
+    Credentials must be stored with `store_lead_creds` first. The access token is derived once
+    and cached with the rest of the request params for the account subtasks.
+
+    Args:
+        lead_id (int): The ID of the lead.
+        mode (str): adsets/campaigns.
+        by_day (bool): Flag indicating whether data is by day.
+        date_from (str): Start date of the time range, defaults to a week ago.
+        date_to (str): End date of the time range, defaults to today.
+
+    Returns:
+        str: The ID of the chord aggregating account stats.
+    """
+    today = datetime.date.today()
+    time_range = json.dumps({
+        'since': date_from or str(today - datetime.timedelta(days=7)),
+        'until': date_to or str(today),
+    })
+    request_params = AdStatisticService.get_request_params(get_lead_cache(AD_STATS_CREDS_KEY, lead_id))
+    cache.set(AD_STATS_PARAMS_KEY.format(lead_id=lead_id), request_params, AD_STATS_CREDS_TIMEOUT)
+    accounts = AdStatisticService.get_ad_accounts(mode, time_range, *request_params).get('data')
+
+    header = group(
+        fetch_account_stats.s(lead_id, account_data, mode, time_range, by_day)
+        for account_data in accounts
+    )
+    callback = store_ad_stats.s(get_ad_stats_cache_key(lead_id, mode, by_day), time_range)
+    return chord(header)(callback).id
+
+
+@app.task(autoretry_for=(AdStatsError,), retry_backoff=True, retry_kwargs={'max_retries': 5})
+def fetch_account_stats(lead_id: int, account_data: dict, mode: str, time_range: str, by_day: bool) -> dict:
+    """
+    Task to fetch FB advertisement statistics of a single ad account.
+
+    Args:
+        lead_id (int): The ID of the lead owning the ad account.
+        account_data (dict): Ad account data as returned by `get_ad_accounts`.
+        mode (str): adsets/campaigns.
+        time_range (str): JSON encoded time range.
+        by_day (bool): Flag indicating whether data is by day.
+
+    Returns:
+        dict: Advertisement statistics of the ad account.
+    """
+    return AdStatisticService.get_account_stats(
+        account_data, mode, time_range, by_day, *get_lead_cache(AD_STATS_PARAMS_KEY, lead_id)
+    )
+
+
+@app.task
+def store_ad_stats(account_stats: list, cache_key: str, time_range: str) -> None:
+    """
+    Task to persist aggregated FB advertisement statistics for the dashboard.
+
+    Args:
+        account_stats (list): Advertisement statistics of every ad account.
+        cache_key (str): The cache key to store stats under.
+        time_range (str): JSON encoded time range of the stats.
+    """
+    cache.set(
+        cache_key,
+        {
+            'updated_at': datetime.datetime.now().isoformat(),
+            'time_range': json.loads(time_range),
+            'stats': account_stats,
+        },
+        timeout=None
+    )
@@ -0,0 +1,61 @@
+import datetime
+import itertools
+import json
+import logging
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+
+from ad_creation_api.exceptions import AdStatsError
+from ad_creation_api.services import AdStatisticService
+
+
+logger = logging.getLogger(__name__)
+
+
+def ndjson_stream(stats):
+    """
+    Serialize advertisement statistics as newline delimited JSON.
+
+    Args:
+        stats (Iterable[dict]): Advertisement statistics of ad accounts.
+
+    Yields:
+        bytes: One JSON encoded ad account per line.
+    """
+    try:
+        for account_stats in stats:
+            yield json.dumps(account_stats).encode('utf-8') + b'\n'
+    except AdStatsError as e:
+        logger.error(f'FB stats export interrupted: {e}')
+        yield json.dumps({'error': str(e)}).encode('utf-8') + b'\n'
+
+
+@login_required
+@require_POST
+def export_ad_stats(request):
+    """
+    Stream FB advertisement statistics as NDJSON, one ad account per line.
+
+    POST request should include by_day, mode, date_from, date_to and lead_creds.
+
+    Returns:
+        StreamingHttpResponse: NDJSON response, or JsonResponse if the request failed before streaming.
+    """
+    try:
+        data = json.loads(request.body)
+        stats = AdStatisticService.iter_ad_stats(
+            by_day=bool(data.get('by_day')),
+            mode=data.get('mode', 'campaigns'),
+            date_from=datetime.date.fromisoformat(data.get('date_from')),
+            date_to=datetime.date.fromisoformat(data.get('date_to')),
+            lead_creds=data.get('lead_creds'),
+        )
+        first_account = next(stats, None)
+    except (AdStatsError, AttributeError, TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    if first_account is not None:
+        stats = itertools.chain([first_account], stats)
+    return StreamingHttpResponse(ndjson_stream(stats), content_type='application/x-ndjson')
@@ -1,79 +1,444 @@
+import bz2
+import codecs
 import csv
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import math
+import shutil
+import tempfile
+import uuid
+import zipfile
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.cache import cache
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+
+CSV_CHUNK_SIZE = 1000
+CSV_UPLOAD_DIR = 'csv_uploads'
+CSV_DECOMPRESSORS = {
+    '.csv.gz': gzip.open,
+    '.csv.bz2': bz2.open,
+    '.csv.xz': lzma.open,
+}
+CSV_UPLOAD_EXTENSIONS = ('.csv', '.zip', *CSV_DECOMPRESSORS)
+CSV_ROW_HASH_TIMEOUT = 60 * 60 * 24 * 30
+CSV_ROW_HASH_KEY = 'csv_row_hash:{user_id}:{url_hash}'
+
+
+class CSVFormatError(ValueError):
+    """
+    Raised when an uploaded file can not be read as CSV.
+    """
 
 
 class CSVParser:
+    @staticmethod
+    def get_upload_extension(filename: str) -> str | None:
+        """
+        Get the extension of an uploaded CSV file.
+
+        Args:
+            filename (str): The name of the uploaded file.
+
+        Returns:
+            str | None: The extension if it is supported, otherwise None.
+        """
+        return next((extension for extension in CSV_UPLOAD_EXTENSIONS if filename.lower().endswith(extension)), None)
+
+    @classmethod
+    def save_upload(cls, csv_file) -> str:
+        """
+        Save an uploaded CSV file to storage, keeping its compression extension.
+
+        Args:
+            csv_file (UploadedFile): The uploaded file.
+
+        Returns:
+            str: The storage path of the saved file.
+        """
+        extension = cls.get_upload_extension(csv_file.name) or '.csv'
+        return default_storage.save(f'{CSV_UPLOAD_DIR}/{uuid.uuid4().hex}{extension}', csv_file)
+
+    @classmethod
+    @contextmanager
+    def open_csv_file(cls, file_path: str) -> Iterator[Iterator[str]]:
+        """
+        Open a stored CSV file, decompressing it on the fly if needed.
+
+        Zip archives are read from their first `.csv` member.
+
+        Args:
+            file_path (str): The storage path of the CSV file.
+
+        Yields:
+            Iterator[str]: Decoded lines of the CSV file.
+
+        Raises:
+            CSVFormatError: If a zip archive contains no `.csv` file.
+        """
+        extension = cls.get_upload_extension(file_path)
+        with default_storage.open(file_path, 'rb') as stored_file:
+            if extension in CSV_DECOMPRESSORS:
+                with CSV_DECOMPRESSORS[extension](stored_file) as csv_file:
+                    yield codecs.iterdecode(csv_file, 'utf-8')
+            elif extension == '.zip':
+                with zipfile.ZipFile(stored_file) as archive:
+                    member = next((name for name in archive.namelist() if name.lower().endswith('.csv')), None)
+                    if member is None:
+                        raise CSVFormatError('The zip archive contains no CSV file')
+                    with archive.open(member) as csv_file:
+                        yield codecs.iterdecode(csv_file, 'utf-8')
+            else:
+                yield codecs.iterdecode(stored_file, 'utf-8')
+
+    @staticmethod
+    def save_csv_part(header: list[str], buckets: list) -> str:
+        """
+        Save buckets of rows of a CSV file as a separate plain CSV file.
+
+        Args:
+            header (list): The header row.
+            buckets (list): Binary files holding CSV encoded rows of the part.
+
+        Returns:
+            str: The storage path of the saved part.
+        """
+        with tempfile.TemporaryFile() as part_file:
+            header_line = io.StringIO()
+            csv.writer(header_line).writerow(header)
+            part_file.write(header_line.getvalue().encode('utf-8'))
+            for bucket in buckets:
+                bucket.seek(0)
+                shutil.copyfileobj(bucket, part_file)
+            part_file.seek(0)
+            return default_storage.save(f'{CSV_UPLOAD_DIR}/{uuid.uuid4().hex}.csv', File(part_file))
+
+    @classmethod
+    def split_csv_file(
+            cls,
+            file_path: str,
+            parts: int,
+            rows_per_part: int,
+            progress_callback: Callable[[int], None] | None = None
+    ) -> tuple[int, list[str]]:
+        """
+        Split a stored, possibly compressed, CSV file into plain CSV parts in a single pass.
+
+        Rows are distributed into `parts` buckets by the hash of their URL, so all rows of a project
+        end up in the same part in file order and parts never race for the same project. Buckets are
+        merged into as many parts as needed for about `rows_per_part` rows per part, at most `parts`.
+        Even a file fitting into one part is rewritten as a plain part, so it is decompressed only once.
+
+        Args:
+            file_path (str): The storage path of the CSV file.
+            parts (int): The maximum number of parts.
+            rows_per_part (int): The number of rows per part the file is split for.
+            progress_callback (Callable | None): Called with the number of rows read after every `rows_per_part` rows.
+
+        Returns:
+            tuple: The number of rows, excluding the header, and storage paths of the parts.
+
+        Raises:
+            KeyError: If the CSV file has no `url` column.
+        """
+        buckets = [tempfile.TemporaryFile() for _ in range(parts)]
+        bucket_lines = [io.TextIOWrapper(bucket, encoding='utf-8', newline='') for bucket in buckets]
+        part_paths = []
+        try:
+            with cls.open_csv_file(file_path) as csv_lines:
+                reader = csv.reader(csv_lines)
+                header = next(reader, [])
+                if header and 'url' not in header:
+                    raise KeyError('url')
+                url_index = header.index('url') if header else 0
+                writers = [csv.writer(lines) for lines in bucket_lines]
+                rows_count = 0
+                for row in reader:
+                    url = row[url_index] if len(row) > url_index else ''
+                    writers[zlib.crc32(url.encode('utf-8')) % parts].writerow(row)
+                    rows_count += 1
+                    if progress_callback is not None and rows_count % rows_per_part == 0:
+                        progress_callback(rows_count)
+
+            for lines in bucket_lines:
+                lines.flush()
+            part_count = min(parts, math.ceil(rows_count / rows_per_part))
+            for index in range(part_count):
+                part_paths.append(cls.save_csv_part(header, buckets[index::part_count]))
+            return rows_count, part_paths
+        except Exception:
+            for part_path in part_paths:
+                default_storage.delete(part_path)
+            raise
+        finally:
+            for lines in bucket_lines:
+                lines.close()
+
+    @classmethod
+    def parse_csv_file(
+            cls,
+            file_path: str,
+            user_id: int,
+            progress_callback: Callable[[int], None] | None = None
+    ) -> tuple[int, int]:
+        """
+        Stream a stored, possibly compressed, CSV file and create or update projects.
+
+        Args:
+            file_path (str): The storage path of the CSV file.
+            user_id (int): The ID of the user.
+            progress_callback (Callable | None): Called with the number of rows after each processed chunk.
+
+        Returns:
+            tuple: A tuple containing the number of objects created and updated.
+        """
+        with cls.open_csv_file(file_path) as csv_lines:
+            return cls.parse_and_create_projects(csv_lines, user_id, progress_callback)
+
     @classmethod
-    def parse_and_create_projects(cls, csv_content: str, user_id: int) -> tuple[int, int]:
+    def parse_and_create_projects(
+            cls,
+            csv_lines: Iterable[str],
+            user_id: int,
+            progress_callback: Callable[[int], None] | None = None
+    ) -> tuple[int, int]:
         """
-        Parse CSV content and create or update projects.
+        Parse CSV lines and create or update projects.
 
         Args:
-            csv_content (str): The content of the CSV file.
+            csv_lines (Iterable[str]): Lines of the CSV file.
             user_id (int): The ID of the user.
+            progress_callback (Callable | None): Called with the number of rows after each processed chunk.
 
         Returns:
             tuple: A tuple containing the number of objects created and updated.
         """
-        decoded_content = csv_content.splitlines()
-        reader = csv.DictReader(decoded_content)
+        reader = csv.DictReader(csv_lines)
         objects_created = 0
         objects_updated = 0
 
-        for row in reader:
-            project, created = cls.create_project(row, user_id)
-            cls.add_technologies(row['technologies'], project)
-            cls.add_industries(row['industries'], project)
-            if created:
-                objects_created += 1
-            objects_updated += 1
+        while rows := list(islice(reader, CSV_CHUNK_SIZE)):
+            created, updated = cls.upsert_projects(rows, user_id)
+            objects_created += created
+            objects_updated += updated
+            if progress_callback is not None:
+                progress_callback(len(rows))
 
         return objects_created, objects_updated
 
     @staticmethod
-    def create_project(row: dict, user_id: int) -> Project:
+    def split_names(names: str) -> set[str]:
+        """
+        Split a comma-separated list of names.
+
+        Args:
+            names (str): Comma-separated list of names.
+
+        Returns:
+            set: Stripped non-empty names.
+        """
+        return {name.strip() for name in names.split(',') if name.strip()}
+
+    @staticmethod
+    def resolve_names(model, names: set[str]) -> dict[str, int]:
+        """
+        Get IDs of technologies or industries by name, creating the missing ones.
+
+        Args:
+            model (Technology | Industry): The tag model.
+            names (set): Tag names.
+
+        Returns:
+            dict: Tag IDs by name.
+        """
+        tag_ids = dict(model.objects.filter(name__in=names).values_list('name', 'pk'))
+        missing_names = names - tag_ids.keys()
+        if missing_names:
+            model.objects.bulk_create([model(name=name) for name in missing_names], ignore_conflicts=True)
+            tag_ids.update(model.objects.filter(name__in=missing_names).values_list('name', 'pk'))
+        return tag_ids
+
+    @staticmethod
+    def get_row_hash_key(user_id: int, url: str) -> str:
         """
-        Create or update a project.
+        Get the cache key of the row hash of a project, identified by its natural key.
 
         Args:
-            row (dict): The row of the CSV file as a dictionary.
             user_id (int): The ID of the user.
+            url (str): The URL of the project.
 
         Returns:
-            tuple: A tuple containing the project object and a boolean indicating if it was created.
+            str: The cache key.
         """
-        return Project.objects.update_or_create(
-            title=row['title'],
-            url=row['url'],
-            description=row['description'],
-            notes=row['notes'],
-            user_id=user_id
-        )
+        return CSV_ROW_HASH_KEY.format(user_id=user_id, url_hash=hashlib.sha1(url.encode()).hexdigest())
 
     @staticmethod
-    def add_technologies(tech_list: str, project: Project) -> None:
+    def get_row_hash(project, technologies: set[str], industries: set[str]) -> str:
         """
-        Add technologies to a project.
+        Hash the imported content of a project.
 
         Args:
-            tech_list (str): Comma-separated list of technologies.
-            project (Project): The project to add technologies to.
+            project (Project): The unsaved project built from the CSV row.
+            technologies (set): Technology names of the project.
+            industries (set): Industry names of the project.
+
+        Returns:
+            str: The hex digest of the content.
+        """
+        content = [project.title, project.description, project.notes, sorted(technologies), sorted(industries)]
+        return hashlib.sha1(json.dumps(content).encode()).hexdigest()
+
+    @classmethod
+    def forget_row_hashes(cls, user_id: int, urls: Iterable[str]) -> None:
         """
-        technologies = [Technology(tech.strip()) for tech in tech_list.split(',')]
-        for tech_name in technologies:
-            tech, _ = Technology.objects.get_or_create(name=tech_name)
-            project.technologies.add(tech)
+        Forget row hashes of projects changed outside of CSV imports, so the next import writes them again.
+
+        Args:
+            user_id (int): The ID of the user.
+            urls (Iterable[str]): URLs of the changed projects.
+        """
+        cache.delete_many([cls.get_row_hash_key(user_id, url) for url in urls])
+
+    @staticmethod
+    def lock_project_urls(user_id: int, urls: Iterable[str]) -> None:
+        """
+        Lock natural keys of the user's projects until the end of the transaction.
+
+        Keys are locked with Postgres advisory locks in a stable order, so concurrent imports
+        of overlapping URLs wait for each other without deadlocking.
+
+        Args:
+            user_id (int): The ID of the user.
+            urls (Iterable[str]): URLs of the projects.
+        """
+        lock_ids = sorted({
+            int.from_bytes(hashlib.sha1(f'{user_id}:{url}'.encode()).digest()[:8], 'big', signed=True)
+            for url in urls
+        })
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(lock_id) FROM unnest(%s::bigint[]) AS lock_id', [lock_ids])
 
     @staticmethod
-    def add_industries(industry_list: str, project: Project) -> None:
+    def get_project_ids(user_id: int, urls: Iterable[str]) -> dict[str, list[int]]:
         """
-        Add industries to a project.
+        Get IDs of the user's projects by URL.
 
         Args:
-            industry_list (str): Comma-separated list of industries.
-            project (Project): The project to add industries to.
+            user_id (int): The ID of the user.
+            urls (Iterable[str]): URLs of the projects.
+
+        Returns:
+            dict: IDs of the projects with each URL, more than one for duplicates.
         """
-        industries = [industry.strip() for industry in industry_list.split(',')]
-        for industry_name in industries:
-            industry, _ = Industry.objects.get_or_create(name=industry_name)
-            project.industries.add(industry)
+        project_ids = dict()
+        for url, project_id in Project.objects.filter(user_id=user_id, url__in=list(urls)).values_list('url', 'pk'):
+            project_ids.setdefault(url, []).append(project_id)
+        return project_ids
+
+    @classmethod
+    def upsert_projects(cls, rows: list[dict], user_id: int) -> tuple[int, int]:
+        """
+        Create or update a chunk of projects with their technologies and industries in bulk.
+
+        Projects are matched by their natural key (user, url). The key is not backed by a unique
+        constraint and older imports left duplicates, so every existing project with the URL is
+        updated, and the URLs of the chunk are locked, so concurrent imports never insert the same
+        URL twice. Rows repeating a URL update the same project and their tags are merged.
+
+        Content hashes of imported projects are kept per user, and projects whose content matches
+        the hash of their last import are skipped without writing to the database or the index.
+        Hashes are forgotten when projects are changed by signals or `ProjectResource` bulk imports;
+        changes made with `QuerySet.update()` bypass both and need `forget_row_hashes`.
+
+        Args:
+            rows (list): Rows of the CSV file as dictionaries.
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple: A tuple containing the number of objects created and updated.
+        """
+        projects = dict()
+        technologies = dict()
+        industries = dict()
+        for row in rows:
+            url = row['url']
+            projects[url] = Project(
+                title=row['title'],
+                url=url,
+                description=row['description'],
+                notes=row['notes'],
+                user_id=user_id
+            )
+            technologies.setdefault(url, set()).update(cls.split_names(row['technologies']))
+            industries.setdefault(url, set()).update(cls.split_names(row['industries']))
+
+        row_hashes = {
+            url: (cls.get_row_hash_key(user_id, url), cls.get_row_hash(project, technologies[url], industries[url]))
+            for url, project in projects.items()
+        }
+        stored_hashes = cache.get_many([key for key, _ in row_hashes.values()])
+        unchanged_urls = {url for url, (key, row_hash) in row_hashes.items() if stored_hashes.get(key) == row_hash}
+        if unchanged_urls:
+            # Hashes can outlive projects renamed or deleted without signals, so check they still exist.
+            unchanged_urls &= set(
+                Project.objects.filter(user_id=user_id, url__in=unchanged_urls).values_list('url', flat=True)
+            )
+        for url in unchanged_urls:
+            del projects[url], technologies[url], industries[url]
+        if not projects:
+            return 0, 0
+        changed_hashes = {row_hashes[url][0]: row_hashes[url][1] for url in projects}
+
+        technology_ids = cls.resolve_names(Technology, set().union(*technologies.values()))
+        industry_ids = cls.resolve_names(Industry, set().union(*industries.values()))
+
+        with transaction.atomic():
+            cls.lock_project_urls(user_id, projects.keys())
+            existing_ids = cls.get_project_ids(user_id, projects.keys())
+            Project.objects.bulk_create(
+                [project for url, project in projects.items() if url not in existing_ids],
+                batch_size=CSV_CHUNK_SIZE
+            )
+            Project.objects.bulk_update(
+                [
+                    Project(pk=pk, user_id=user_id, url=url, title=project.title,
+                            description=project.description, notes=project.notes)
+                    for url, project in projects.items()
+                    for pk in existing_ids.get(url, ())
+                ],
+                ['title', 'description', 'notes'],
+                batch_size=CSV_CHUNK_SIZE
+            )
+            project_ids = cls.get_project_ids(user_id, projects.keys())
+            Project.technologies.through.objects.bulk_create(
+                [
+                    Project.technologies.through(project_id=project_id, technology_id=technology_ids[name])
+                    for url, names in technologies.items()
+                    for project_id in project_ids[url]
+                    for name in names
+                ],
+                ignore_conflicts=True
+            )
+            Project.industries.through.objects.bulk_create(
+                [
+                    Project.industries.through(project_id=project_id, industry_id=industry_ids[name])
+                    for url, names in industries.items()
+                    for project_id in project_ids[url]
+                    for name in names
+                ],
+                ignore_conflicts=True
+            )
+            indexed_projects = {project_id: user_id for ids in project_ids.values() for project_id in ids}
+            transaction.on_commit(lambda: queue_project_index(indexed_projects))
+            transaction.on_commit(lambda: cache.set_many(changed_hashes, CSV_ROW_HASH_TIMEOUT))
 
+        return len(projects.keys() - existing_ids.keys()), sum(1 for row in rows if row['url'] in projects)
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .services import CSVParser
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs) -> None:
+    """
+    Signal handler forgetting the CSV row hash of a saved or deleted project.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The instance of the Project model.
+        kwargs: Additional keyword arguments.
+    """
+    user_id, url = instance.user_id, instance.url
+    transaction.on_commit(lambda: CSVParser.forget_row_hashes(user_id, [url]))
+
+
+@receiver(projects_changed, sender=Project)
+def projects_bulk_changed(sender, projects: list[tuple], **kwargs) -> None:
+    """
+    Signal handler forgetting CSV row hashes of projects whose tags changed or which were changed in bulk.
+
+    Args:
+        sender: The sender of the signal.
+        projects: IDs, user IDs and URLs of the changed projects.
+        kwargs: Additional keyword arguments.
+    """
+    urls_by_user = dict()
+    for _, user_id, url in projects:
+        urls_by_user.setdefault(user_id, []).append(url)
+    for user_id, urls in urls_by_user.items():
+        CSVParser.forget_row_hashes(user_id, urls)
@@ -1,27 +1,346 @@
+import time
+from contextlib import contextmanager
+
+from celery import chord, group
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+
 logger = logging.getLogger(__name__)
 
-@app.task
-def process_csv_file(csv_content: str, user_id: int) -> tuple:
+CSV_TASK_CHUNK_ROWS = 20000
+CSV_TASK_PARTS = 16
+CSV_PROGRESS_TIMEOUT = 60 * 60 * 24
+CSV_PROGRESS_KEY = 'csv_import_progress:{upload_id}:{field}'
+CSV_PROGRESS_FIELDS = ('total', 'rows', 'errors', 'started')
+CSV_IMPORTED_PROJECTS_KEY = 'csv_import_projects:{part_path}'
+CSV_INDEX_BATCH_SIZE = 1000
+
+
+class CSVImportProgress:
+    """
+    Progress of a CSV import shared by the tasks processing its chunks.
+
+    Counters are kept in the cache and the computed progress is published as `PROGRESS`
+    meta of the upload task, so `AsyncResult(upload_id).info` reports it while the import runs.
+    """
+    def __init__(self, upload_id: str):
+        self.upload_id = upload_id
+
+    def get_key(self, field: str) -> str:
+        return CSV_PROGRESS_KEY.format(upload_id=self.upload_id, field=field)
+
+    def split(self, rows_read: int) -> None:
+        """
+        Publish the progress of splitting the CSV file, before any row is imported.
+
+        Args:
+            rows_read (int): The number of rows read from the CSV file so far.
+
+        """
+        try:
+            process_csv_file.update_state(
+                task_id=self.upload_id, state='PROGRESS', meta={'stage': 'splitting', 'rows_read': rows_read}
+            )
+        except Exception as e:
+            logger.warning(f'Failed to report progress of CSV import {self.upload_id}: {e}')
+
+    def start(self, total_rows: int) -> None:
+        """
+        Reset counters of the import and publish the initial progress.
+
+        Args:
+            total_rows (int): The number of rows in the CSV file.
+
+        """
+        try:
+            cache.set_many(
+                {
+                    self.get_key('total'): total_rows,
+                    self.get_key('rows'): 0,
+                    self.get_key('errors'): 0,
+                    self.get_key('started'): time.time(),
+                },
+                CSV_PROGRESS_TIMEOUT
+            )
+            self.publish()
+        except Exception as e:
+            logger.warning(f'Failed to report progress of CSV import {self.upload_id}: {e}')
+
+    def increment(self, field: str, delta: int = 1) -> None:
+        """
+        Increment a counter and publish the progress.
+
+        Progress reporting is best effort: counters evicted from the cache are recreated
+        and errors are logged, so they never fail the import.
+
+        Args:
+            field (str): The name of the counter.
+            delta (int): The amount to add.
+
+        """
+        try:
+            cache.add(self.get_key(field), 0, CSV_PROGRESS_TIMEOUT)
+            cache.incr(self.get_key(field), delta)
+            self.publish()
+        except Exception as e:
+            logger.warning(f'Failed to report progress of CSV import {self.upload_id}: {e}')
+
+    def add_rows(self, rows: int) -> None:
+        """
+        Count processed rows and publish the progress.
+
+        Args:
+            rows (int): The number of rows processed since the last call.
+
+        """
+        self.increment('rows', rows)
+
+    def add_error(self) -> None:
+        """
+        Count a failed chunk and publish the progress.
+        """
+        self.increment('errors')
+
+    def get_meta(self) -> dict:
+        """
+        Compute the progress from the counters.
+
+        Returns:
+            dict: The importing stage, total and processed rows, rows per second, ETA in seconds and the number of errors.
+
+        """
+        values = cache.get_many([self.get_key(field) for field in CSV_PROGRESS_FIELDS])
+        total, rows, errors, started = (values.get(self.get_key(field), 0) for field in CSV_PROGRESS_FIELDS)
+        elapsed = time.time() - started if started else 0
+        rows_per_second = rows / elapsed if elapsed > 0 else 0
+        return {
+            'stage': 'importing',
+            'total': total,
+            'rows': rows,
+            'rows_per_second': round(rows_per_second, 1),
+            'eta': round((total - rows) / rows_per_second) if rows_per_second else None,
+            'errors': errors,
+        }
+
+    def publish(self) -> None:
+        process_csv_file.update_state(task_id=self.upload_id, state='PROGRESS', meta=self.get_meta())
+
+    def clear(self) -> None:
+        cache.delete_many([self.get_key(field) for field in CSV_PROGRESS_FIELDS])
+
+
+def get_imported_projects_keys(part_paths: list[str]) -> list[str]:
+    return [CSV_IMPORTED_PROJECTS_KEY.format(part_path=part_path) for part_path in part_paths]
+
+
+def index_imported_projects(projects: dict[int, int]) -> None:
     """
-    Process the CSV file content to create or update projects.
+    Bulk index the final state of projects touched by a CSV import.
 
     Args:
-        csv_content (str): The content of the CSV file.
-        user_id (int): The ID of the user who owns the projects.
+        projects (dict[int, int]): User IDs by ID of the imported projects.
 
-    Returns:
-        Tuple[int, int]: A tuple containing the number of objects created and updated.
+    """
+    items = list(projects.items())
+    for start in range(0, len(items), CSV_INDEX_BATCH_SIZE):
+        sync_projects_index(dict(items[start:start + CSV_INDEX_BATCH_SIZE]))
+
+
+@app.task(autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={'max_retries': 5})
+def index_csv_import(projects: list) -> None:
+    """
+    Task to retry bulk indexing of projects touched by a CSV import.
+
+    Args:
+        projects (list): Pairs of project ID and user ID, as JSON has no integer keys.
+
+    """
+    index_imported_projects(dict(projects))
+
+
+def index_imported_projects_or_retry(upload_id: str, projects: dict[int, int]) -> None:
+    """
+    Bulk index projects touched by a CSV import, handing them to a retrying task on failure.
+
+    Indexing errors are logged instead of raised, so they never replace the result of the import.
+
+    Args:
+        upload_id (str): The ID of the upload task.
+        projects (dict[int, int]): User IDs by ID of the imported projects.
+
+    """
+    try:
+        index_imported_projects(projects)
+    except Exception as e:
+        logger.error(f'Failed to index projects of CSV import {upload_id}, retrying: {e}')
+        index_csv_import.delay(list(projects.items()))
+
+
+def index_imported_chunks(part_paths: list[str]) -> None:
+    """
+    Bulk index projects collected by chunks of a CSV import and forget them.
+
+    Args:
+        part_paths (list[str]): Storage paths of the parts of the CSV file processed by the chunks.
+
+    """
+    keys = get_imported_projects_keys(part_paths)
+    projects = dict()
+    for chunk_projects in cache.get_many(keys).values():
+        projects.update(chunk_projects)
+    index_imported_projects(projects)
+    cache.delete_many(keys)
+
+
+@contextmanager
+def csv_processing_errors():
+    """
+    Convert errors raised during CSV processing into messages shown to the user.
 
     Raises:
+        CSVFormatError: If the uploaded file contains no CSV file.
         KeyError: If the CSV file misses any required field.
         Exception: If any other error occurs during CSV processing.
 
     """
     try:
-        objects_created, objects_updated = CSVParser.parse_and_create_projects(csv_content, user_id)
-        return objects_created, objects_updated
+        yield
+    except CSVFormatError:
+        raise
     except KeyError as e:
         raise KeyError(f'CSV file missed required field: {",".join(e.args)}')
     except Exception as e:
         logger.error(f'Something went wrong during CSV processing: {e}')
         raise Exception("Something went wrong, try again later")
+
+
+@app.task(bind=True)
+def process_csv_file(self, file_path: str, user_id: int) -> tuple:
+    """
+    Process the stored CSV file to create or update projects, deleting the file afterwards.
+
+    The file is decompressed once, while it is split by URL into at most `CSV_TASK_PARTS` plain CSV
+    parts of about `CSV_TASK_CHUNK_ROWS` rows, so rows of the same project are processed by one part
+    in file order. A single part is processed inline, more parts by a group of `process_csv_chunk`
+    tasks. The task is replaced by a chord summing their results, so its result is still the total
+    for the upload. Until then the task reports `CSVImportProgress` meta in the `PROGRESS` state,
+    starting with the rows read while the file is split.
+
+    Realtime indexing is suspended during the import. Touched projects are collected and
+    bulk indexed once at the end, including when the import fails midway.
+
+    Args:
+        file_path (str): The storage path of the CSV file.
+        user_id (int): The ID of the user who owns the projects.
+
+    Returns:
+        Tuple[int, int]: A tuple containing the number of objects created and updated.
+
+    Raises:
+        CSVFormatError: If the uploaded file contains no CSV file.
+        KeyError: If the CSV file misses any required field.
+        Exception: If any other error occurs during CSV processing.
+
+    """
+    upload_id = self.request.id
+    progress = CSVImportProgress(upload_id)
+    progress.split(0)
+    try:
+        with csv_processing_errors():
+            rows_count, part_paths = CSVParser.split_csv_file(
+                file_path, CSV_TASK_PARTS, CSV_TASK_CHUNK_ROWS, progress_callback=progress.split
+            )
+    finally:
+        default_storage.delete(file_path)
+    progress.start(rows_count)
+
+    if len(part_paths) > 1:
+        chunks = group(process_csv_chunk.s(part_path, user_id, upload_id) for part_path in part_paths)
+        callback = sum_csv_results.s(upload_id, part_paths).on_error(
+            reconcile_csv_import.si(upload_id, part_paths)
+        )
+        return self.replace(chord(chunks, callback))
+
+    try:
+        with suspend_project_index() as imported_projects, csv_processing_errors():
+            if not part_paths:
+                return 0, 0
+            objects_created, objects_updated = CSVParser.parse_csv_file(
+                part_paths[0], user_id, progress_callback=progress.add_rows
+            )
+            return objects_created, objects_updated
+    finally:
+        for part_path in part_paths:
+            default_storage.delete(part_path)
+        progress.clear()
+        index_imported_projects_or_retry(upload_id, imported_projects)
+
+
+@app.task
+def process_csv_chunk(part_path: str, user_id: int, upload_id: str) -> tuple:
+    """
+    Process a part of the stored CSV file to create or update projects, deleting the part afterwards.
+
+    Projects touched by the chunk are stored for the chord callback, which indexes them.
+
+    Args:
+        part_path (str): The storage path of the part of the CSV file.
+        user_id (int): The ID of the user who owns the projects.
+        upload_id (str): The ID of the upload task reporting the progress.
+
+    Returns:
+        Tuple[int, int]: A tuple containing the number of objects created and updated.
+
+    """
+    progress = CSVImportProgress(upload_id)
+    try:
+        with suspend_project_index() as imported_projects, csv_processing_errors():
+            return CSVParser.parse_csv_file(part_path, user_id, progress_callback=progress.add_rows)
+    except Exception:
+        progress.add_error()
+        raise
+    finally:
+        default_storage.delete(part_path)
+        cache.set(CSV_IMPORTED_PROJECTS_KEY.format(part_path=part_path), imported_projects, CSV_PROGRESS_TIMEOUT)
+
+
+@app.task
+def sum_csv_results(results: list, upload_id: str, part_paths: list[str]) -> tuple:
+    """
+    Sum results of the chunks of a CSV file and index the imported projects.
+
+    Args:
+        results (list): Numbers of objects created and updated by each chunk.
+        upload_id (str): The ID of the upload task reporting the progress.
+        part_paths (list[str]): Storage paths of the parts of the CSV file processed by the chunks.
+
+    Returns:
+        Tuple[int, int]: A tuple containing the number of objects created and updated.
+
+    """
+    try:
+        index_imported_chunks(part_paths)
+    except Exception as e:
+        logger.error(f'Failed to index projects of CSV import {upload_id}, retrying: {e}')
+        reconcile_csv_import.delay(upload_id, part_paths)
+    CSVImportProgress(upload_id).clear()
+    return sum(created for created, _ in results), sum(updated for _, updated in results)
+
+
+@app.task(autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={'max_retries': 5})
+def reconcile_csv_import(upload_id: str, part_paths: list[str]) -> None:
+    """
+    Index projects written by the chunks of a failed import and delete parts of the CSV file left behind.
+
+    Collected projects are forgotten only once indexed, so the task is retried on indexing errors.
+
+    Args:
+        upload_id (str): The ID of the upload task reporting the progress.
+        part_paths (list[str]): Storage paths of the parts of the CSV file processed by the chunks.
+
+    """
+    for part_path in part_paths:
+        default_storage.delete(part_path)
+    index_imported_chunks(part_paths)
+    CSVImportProgress(upload_id).clear()
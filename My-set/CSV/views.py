@@ -1,4 +1,5 @@
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from celery.result import AsyncResult
 
@@ -18,12 +19,12 @@ def upload_csv_view(request):
     if request.method == 'POST' and request.FILES:
         csv_file = request.FILES['csv_file']
 
-        if not csv_file.name.endswith('.csv'):
-            message = '* The file should be in CSV format'
+        if CSVParser.get_upload_extension(csv_file.name) is None:
+            message = '* The file should be in CSV format, optionally compressed with gzip, bzip2, xz or zip'
             return render(request, 'upload_csv.html', {'message': message})
 
-        csv_content = csv_file.read().decode('utf-8')
-        task = process_csv_file.delay(csv_content, request.user.id)
+        file_path = CSVParser.save_upload(csv_file)
+        task = process_csv_file.delay(file_path, request.user.id)
         data = {
             'filename': csv_file.name,
             'task_id': task.id
@@ -51,6 +52,7 @@ def check_upload_status(request):
     error_message = None
     objects_created = None
     objects_updated = None
+    progress = None
 
     if task_id:
         task_result = AsyncResult(task_id)
@@ -61,6 +63,9 @@ def check_upload_status(request):
             else:
                 error_message = task_result.result
 
+        elif task_result.status == 'PROGRESS':
+            progress = task_result.info
+
         data = {
             'task_id': task_id,
             'filename': filename,
@@ -68,7 +73,38 @@ def check_upload_status(request):
             'error_message': error_message,
             'objects_created': objects_created,
             'objects_updated': objects_updated,
+            'progress': progress,
         }
 
         return render(request, 'check_upload_status.html', data)
     return redirect(request, 'upload_csv')
+
+
+@login_required
+def upload_progress(request):
+    """
+    View function to poll the progress of the CSV processing task.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: The task status with rows read while the file is split, then processed rows,
+        rows per second, ETA and errors, or the numbers of created and updated objects once it finished.
+
+    """
+    task_id = request.GET.get('task_id')
+    if not task_id:
+        return JsonResponse({'error': 'task_id is required'}, status=400)
+
+    task_result = AsyncResult(task_id)
+    data = {'task_status': task_result.status}
+    if task_result.status == 'PROGRESS':
+        data['progress'] = task_result.info
+    elif task_result.ready():
+        if task_result.successful():
+            data['objects_created'], data['objects_updated'] = task_result.result
+        else:
+            data['error_message'] = str(task_result.result)
+
+    return JsonResponse(data)
@@ -1,32 +1,90 @@
 @registry.register_document
 class ProjectDocument(Document):
+    title = fields.TextField(fields={'suggest': fields.SearchAsYouTypeField()})
     technologies = fields.ObjectField(
         properties={
             'id': fields.IntegerField(),
-            'name': fields.TextField(fields={'keyword': fields.KeywordField()})
+            'name': fields.TextField(fields={'keyword': fields.KeywordField(), 'suggest': fields.SearchAsYouTypeField()})
         }
     )
     industries = fields.ObjectField(
         properties={
             'id': fields.IntegerField(),
-            'name': fields.TextField(fields={'keyword': fields.KeywordField()})
+            'name': fields.TextField(fields={'keyword': fields.KeywordField(), 'suggest': fields.SearchAsYouTypeField()})
         }
     )
     user = fields.ObjectField(properties={'id': fields.IntegerField()})
 
     class Index:
+        # Documents are routed by user ID, changing the number of shards requires `reindex_projects`.
         name = 'projects'
         settings = {'number_of_shards': 1,
                     'number_of_replicas': 1}
 
     class Django:
         model = Project
+        # Index updates are queued by ES.signals and flushed in bulk by ES.tasks.flush_project_index.
+        ignore_signals = True
         fields = [
             'id',
-            'title',
             'url',
             'description',
             'notes',
             'is_public',
             'is_original'
         ]
+
+    @classmethod
+    def user_search(cls, user_id: int):
+        """
+        Search the projects of a user on the single shard they are routed to.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Search: The Elasticsearch query routed by the user ID.
+
+        """
+        return cls.search().params(routing=user_id)
+
+    def _prepare_action(self, object_instance, action):
+        """
+        Prepare a bulk action routed by the project user ID.
+
+        Args:
+            object_instance (Project): The project to index or delete.
+            action (str): The bulk action.
+
+        Returns:
+            dict: The bulk action.
+
+        """
+        prepared_action = super()._prepare_action(object_instance, action)
+        prepared_action['_routing'] = object_instance.user_id
+        return prepared_action
+
+    def update(self, thing, refresh=None, action='index', parallel=False, **kwargs):
+        """
+        Update the index and invalidate cached facets of the affected users.
+
+        Args:
+            thing (Project | Iterable[Project]): The project(s) to index or delete.
+            refresh (bool): Whether to refresh the index after the update.
+            action (str): The bulk action, 'index' or 'delete'.
+            parallel (bool): Whether to use parallel bulk.
+            **kwargs: Additional keyword arguments for the bulk helper.
+
+        """
+        if isinstance(thing, models.Model):
+            user_ids = {thing.user_id}
+        elif isinstance(thing, QuerySet):
+            user_ids = set(thing.values_list('user_id', flat=True).distinct())
+        else:
+            thing = list(thing)
+            user_ids = {instance.user_id for instance in thing}
+
+        result = super().update(thing, refresh=refresh, action=action, parallel=parallel, **kwargs)
+        for user_id in user_ids:
+            FacetCacheService.bump_generation(user_id)
+        return result
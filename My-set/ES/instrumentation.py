@@ -0,0 +1,173 @@
+import contextvars
+import json
+import logging
+import time
+
+from django.conf import settings
+from elasticsearch_dsl import MultiSearch, Response, Search
+
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('elasticsearch.slow_queries')
+
+SLOW_QUERY_MS = getattr(settings, 'ES_SLOW_QUERY_MS', 500)
+PROFILE_SLOW_QUERIES = getattr(settings, 'ES_PROFILE_SLOW_QUERIES', False)
+TRACK_RESPONSE_SIZE = getattr(settings, 'ES_TRACK_RESPONSE_SIZE', False)
+
+search_metrics = contextvars.ContextVar('search_metrics', default=None)
+
+
+class SearchMetrics:
+    """
+    Elasticsearch requests made while handling a single HTTP request.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.took_ms = 0
+        self.wall_ms = 0.0
+        self.response_bytes = 0
+        self.slow_queries = []
+
+    def to_dict(self) -> dict:
+        return {
+            'queries': self.queries,
+            'took_ms': self.took_ms,
+            'wall_ms': round(self.wall_ms, 2),
+            'response_bytes': self.response_bytes,
+            'slow_queries': self.slow_queries,
+        }
+
+
+def get_response_size(response_body) -> int:
+    """
+    Estimate the size of a response as its re-serialized JSON, if `ES_TRACK_RESPONSE_SIZE` is enabled.
+
+    Re-serializing costs CPU proportional to the response, so it is off by default.
+
+    Args:
+        response_body (Callable[[], dict]): Returns the response as a dict.
+
+    Returns:
+        int: The size in bytes, or 0 if tracking is disabled.
+
+    """
+    return len(json.dumps(response_body())) if TRACK_RESPONSE_SIZE else 0
+
+
+def record_search(label: str, body, took_ms: int, wall_ms: float, response_bytes: int = 0) -> None:
+    """
+    Record an executed Elasticsearch request in the metrics of the current HTTP request.
+
+    Args:
+        label (str): The name of the query for logs.
+        body: The request body.
+        took_ms (int): Time spent by Elasticsearch.
+        wall_ms (float): Time including network and (de)serialization.
+        response_bytes (int): The size of the response, see `get_response_size`.
+
+    """
+    metrics = search_metrics.get()
+    if metrics is not None:
+        metrics.queries += 1
+        metrics.took_ms += took_ms
+        metrics.wall_ms += wall_ms
+        metrics.response_bytes += response_bytes
+
+    if wall_ms >= SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            f'Slow ES query {label}: took {took_ms}ms, wall {wall_ms:.0f}ms, body {json.dumps(body)}'
+        )
+        if metrics is not None:
+            metrics.slow_queries.append({'label': label, 'took_ms': took_ms, 'wall_ms': round(wall_ms, 2)})
+
+
+def profile_search(label: str, es_set: Search) -> None:
+    """
+    Re-run a slow query with the profile API and log the profile.
+
+    Args:
+        label (str): The name of the query for logs.
+        es_set (Search): The slow Elasticsearch query.
+
+    """
+    profile = es_set.extra(profile=True).execute().to_dict().get('profile')
+    slow_query_logger.warning(f'Profile of slow ES query {label}: {json.dumps(profile)}')
+
+
+def execute_search(es_set: Search, label: str = '') -> Response:
+    """
+    Execute an Elasticsearch query, recording it in request metrics and the slow query log.
+
+    Args:
+        es_set (Search): The Elasticsearch query.
+        label (str): The name of the query for logs.
+
+    Returns:
+        Response: The Elasticsearch response.
+
+    """
+    if hasattr(es_set, '_response'):
+        return es_set._response
+
+    start = time.perf_counter()
+    response = es_set.execute()
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    record_search(label, es_set.to_dict(), response.took, wall_ms, get_response_size(response.to_dict))
+    if PROFILE_SLOW_QUERIES and wall_ms >= SLOW_QUERY_MS:
+        profile_search(label, es_set)
+    return response
+
+
+def execute_multi_search(multi_search: MultiSearch, label: str = '') -> list[Response]:
+    """
+    Execute an Elasticsearch multi-search, recording it in request metrics and the slow query log.
+
+    Args:
+        multi_search (MultiSearch): The Elasticsearch multi-search.
+        label (str): The name of the multi-search for logs.
+
+    Returns:
+        list[Response]: The Elasticsearch responses.
+
+    """
+    start = time.perf_counter()
+    responses = multi_search.execute()
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    record_search(
+        label,
+        multi_search.to_dict(),
+        max((response.took for response in responses), default=0),
+        wall_ms,
+        get_response_size(lambda: {'responses': [response.to_dict() for response in responses]}),
+    )
+    if PROFILE_SLOW_QUERIES and wall_ms >= SLOW_QUERY_MS:
+        for index, es_set in enumerate(multi_search._searches):
+            profile_search(f'{label}[{index}]', es_set)
+    return responses
+
+
+class SearchMetricsMiddleware:
+    """
+    Collect Elasticsearch metrics per request and expose them as `request.search_metrics`
+    and the `Server-Timing` response header.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = SearchMetrics()
+        request.search_metrics = metrics
+        token = search_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            search_metrics.reset(token)
+
+        if metrics.queries:
+            response['Server-Timing'] = (
+                f'es;dur={metrics.wall_ms:.1f};desc="{metrics.queries} queries", es-took;dur={metrics.took_ms}'
+            )
+            logger.info(f'ES metrics for {request.path}: {json.dumps(metrics.to_dict())}')
+        return response
@@ -0,0 +1,182 @@
+import itertools
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from elasticsearch.helpers import streaming_bulk
+from elasticsearch_dsl.connections import connections
+
+from ...documents import ProjectDocument
+from ...instrumentation import SearchMetrics, search_metrics
+from ...services import FacetCacheService
+from ...views import project_list
+
+
+SCALES = {
+    '1k': {'projects': 1_000, 'users': 10, 'technologies': 50, 'industries': 20},
+    '100k': {'projects': 100_000, 'users': 100, 'technologies': 500, 'industries': 100},
+    '1m': {'projects': 1_000_000, 'users': 200, 'technologies': 5_000, 'industries': 500},
+}
+WORDS = (
+    'data platform mobile payments analytics cloud health logistics marketplace booking '
+    'learning video social energy travel retail security insurance crm automation'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark project_list against a synthetic projects index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='1k')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--reuse-index', action='store_true', help='Do not reseed an existing benchmark index.')
+        parser.add_argument('--warm', action='store_true', help='Keep the facet cache between requests.')
+
+    def iter_documents(self, index_name: str, scale: dict, rng: random.Random):
+        """
+        Generate synthetic project documents.
+
+        Args:
+            index_name (str): The name of the benchmark index.
+            scale (dict): Numbers of projects, users and tags.
+            rng (random.Random): The random generator.
+
+        Yields:
+            dict: Bulk index actions.
+        """
+        for project_id in range(1, scale['projects'] + 1):
+            user_id = rng.randint(1, scale['users'])
+            technologies = rng.sample(range(1, scale['technologies'] + 1), rng.randint(1, 5))
+            industries = rng.sample(range(1, scale['industries'] + 1), rng.randint(1, 2))
+            yield {
+                '_index': index_name,
+                '_id': project_id,
+                '_routing': user_id,
+                '_source': {
+                    'id': project_id,
+                    'title': ' '.join(rng.choices(WORDS, k=3)),
+                    'url': f'https://example.com/{project_id}',
+                    'description': ' '.join(rng.choices(WORDS, k=30)),
+                    'notes': '',
+                    'is_public': rng.random() < 0.5,
+                    'is_original': rng.random() < 0.5,
+                    'user': {'id': user_id},
+                    'technologies': [{'id': tag, 'name': f'technology-{tag}'} for tag in technologies],
+                    'industries': [{'id': tag, 'name': f'industry-{tag}'} for tag in industries],
+                },
+            }
+
+    def seed_index(self, index_name: str, scale: dict, rng: random.Random) -> None:
+        """
+        Create the benchmark index and fill it with synthetic projects.
+
+        Args:
+            index_name (str): The name of the benchmark index.
+            scale (dict): Numbers of projects, users and tags.
+            rng (random.Random): The random generator.
+        """
+        es = connections.get_connection()
+        if es.indices.exists(index=index_name):
+            es.indices.delete(index=index_name)
+        ProjectDocument._index.clone(name=index_name).create()
+        for ok, info in streaming_bulk(es, self.iter_documents(index_name, scale, rng), chunk_size=5000):
+            if not ok:
+                self.stderr.write(f'Failed to index project: {info}')
+        es.indices.refresh(index=index_name)
+
+    def get_scenarios(self) -> list[tuple[str, dict]]:
+        """
+        Build request parameters for every combination of search, tag filters and page.
+
+        Returns:
+            list[tuple[str, dict]]: Scenario names and GET parameters.
+        """
+        scenarios = []
+        for search, industries, technologies, page in itertools.product(
+                ('', 'data'), ([], ['industry-1']), ([], ['technology-1', 'technology-2']), (1, 50)
+        ):
+            params = {'page': page}
+            if search:
+                params['search'] = search
+            if industries:
+                params['industries'] = industries
+            if technologies:
+                params['technologies'] = technologies
+            name = f'search={bool(search)} industries={len(industries)} technologies={len(technologies)} page={page}'
+            scenarios.append((name, params))
+        return scenarios
+
+    def handle(self, *args, **options):
+        scale = SCALES[options['scale']]
+        rng = random.Random(options['seed'])
+        index_name = f'{ProjectDocument._index._name}-benchmark-{options["scale"]}'
+
+        es = connections.get_connection()
+        if not (options['reuse_index'] and es.indices.exists(index=index_name)):
+            self.seed_index(index_name, scale, rng)
+
+        original_index_name = ProjectDocument._index._name
+        ProjectDocument._index._name = index_name
+        try:
+            self.run_scenarios(scale, rng, options['iterations'], options['warm'])
+        finally:
+            ProjectDocument._index._name = original_index_name
+            self.invalidate_user_caches(scale)
+
+    def invalidate_user_caches(self, scale: dict) -> None:
+        """
+        Bump the index generation of every synthetic user, so real users with the same IDs
+        never see facets or suggestions cached from the benchmark index.
+
+        Args:
+            scale (dict): Numbers of projects, users and tags.
+        """
+        for user_id in range(1, scale['users'] + 1):
+            FacetCacheService.bump_generation(user_id)
+
+    def run_scenarios(self, scale: dict, rng: random.Random, iterations: int, warm: bool) -> None:
+        """
+        Drive project_list through every scenario and report request counts and latency.
+
+        Args:
+            scale (dict): Numbers of projects, users and tags.
+            rng (random.Random): The random generator.
+            iterations (int): The number of requests per scenario.
+            warm (bool): Whether to keep the facet cache between requests.
+        """
+        factory = RequestFactory()
+        self.stdout.write(f'{"scenario":<60} {"es":>6} {"sql":>6} {"p50 ms":>9} {"p99 ms":>9}')
+        for name, params in self.get_scenarios():
+            latencies = []
+            es_queries = []
+            sql_queries = []
+            for _ in range(iterations):
+                user_id = rng.randint(1, scale['users'])
+                if not warm:
+                    FacetCacheService.bump_generation(user_id)
+                request = factory.get('/projects/', params)
+                request.user = SimpleNamespace(id=user_id, pk=user_id, is_authenticated=True)
+
+                metrics = SearchMetrics()
+                token = search_metrics.set(metrics)
+                try:
+                    with CaptureQueriesContext(connection) as captured:
+                        start = time.perf_counter()
+                        project_list(request)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                finally:
+                    search_metrics.reset(token)
+                es_queries.append(metrics.queries)
+                sql_queries.append(len(captured))
+
+            percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f'{name:<60} {statistics.mean(es_queries):>6.1f} {statistics.mean(sql_queries):>6.1f} '
+                f'{statistics.median(latencies):>9.1f} {percentiles[98]:>9.1f}'
+            )
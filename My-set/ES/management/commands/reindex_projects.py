@@ -0,0 +1,201 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections as db_connections
+from elasticsearch.helpers import bulk, parallel_bulk
+from elasticsearch_dsl.connections import connections
+
+from ...documents import ProjectDocument
+from ...models import Project
+from ...tasks import (
+    PROJECT_REINDEX_CHANGES_KEY,
+    PROJECT_REINDEX_KEY,
+    PROJECT_REINDEX_SEQ_KEY,
+    PROJECT_REINDEX_TIMEOUT,
+)
+
+
+def prepare_actions(index_name: str, projects: list) -> list[dict]:
+    """
+    Prepare bulk index actions for a chunk of projects.
+
+    Args:
+        index_name (str): The name of the index to write to.
+        projects (list[Project]): Projects with prefetched technologies and industries.
+
+    Returns:
+        list[dict]: Bulk index actions.
+    """
+    document = ProjectDocument()
+    return [
+        {
+            '_op_type': 'index',
+            '_index': index_name,
+            '_id': project.pk,
+            '_routing': project.user_id,
+            '_source': document.prepare(project),
+        }
+        for project in projects
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the projects index into a new index and atomically swap the alias to it. '
+        'Also migrates documents indexed before routing by user ID was introduced. '
+        'Projects changed during the rebuild are re-synced before the swap; the swap is aborted on errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--keep-old', action='store_true', help='Do not delete the previous indices.')
+
+    def iter_chunks(self, chunk_size: int):
+        """
+        Stream projects ordered by primary key in chunks with their tags prefetched.
+
+        Args:
+            chunk_size (int): The number of projects per chunk.
+
+        Yields:
+            list[Project]: A chunk of projects.
+        """
+        queryset = Project.objects.prefetch_related('technologies', 'industries').order_by('pk')
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1].pk
+            yield chunk
+
+    def iter_actions(self, index_name: str, chunk_size: int, workers: int):
+        """
+        Prepare documents in a process pool, keeping a bounded number of chunks in flight.
+
+        Args:
+            index_name (str): The name of the index to write to.
+            chunk_size (int): The number of projects per chunk.
+            workers (int): The number of worker processes.
+
+        Yields:
+            dict: Bulk index actions.
+        """
+        db_connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in self.iter_chunks(chunk_size):
+                pending.append(executor.submit(prepare_actions, index_name, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def sync_changes(self, index_name: str, first_seq: int) -> tuple[int, int]:
+        """
+        Re-sync projects changed since the given sequence of recorded changes into the new index.
+
+        Args:
+            index_name (str): The name of the index to write to.
+            first_seq (int): The last sequence already synced.
+
+        Returns:
+            tuple[int, int]: The last synced sequence and the number of synced projects.
+
+        Raises:
+            CommandError: If any of the changed projects failed to sync.
+        """
+        last_seq = cache.get(PROJECT_REINDEX_SEQ_KEY, 0)
+        keys = [PROJECT_REINDEX_CHANGES_KEY.format(seq=seq) for seq in range(first_seq + 1, last_seq + 1)]
+        projects = dict()
+        for changed in cache.get_many(keys).values():
+            projects.update(changed)
+
+        instances = list(Project.objects.filter(pk__in=list(projects)).prefetch_related('technologies', 'industries'))
+        actions = prepare_actions(index_name, instances)
+        deleted = projects.keys() - {instance.pk for instance in instances}
+        actions.extend(
+            {'_op_type': 'delete', '_index': index_name, '_id': project_id, '_routing': projects[project_id]}
+            for project_id in deleted
+        )
+        if actions:
+            _, errors = bulk(connections.get_connection(), actions, raise_on_error=False)
+            for info in errors:
+                self.stderr.write(f'Failed to re-sync project: {info}')
+            if errors:
+                raise CommandError(f'Failed to re-sync {len(errors)} projects changed during the rebuild.')
+        cache.delete_many(keys)
+        return last_seq, len(projects)
+
+    def handle(self, *args, **options):
+        es = connections.get_connection()
+        alias = ProjectDocument._index._name
+        index_name = f'{alias}-{datetime.now():%Y%m%d%H%M%S}'
+
+        ProjectDocument._index.clone(name=index_name).create()
+        es.indices.put_settings(index=index_name, body={'index': {'refresh_interval': '-1', 'number_of_replicas': 0}})
+
+        synced_seq = cache.get(PROJECT_REINDEX_SEQ_KEY, 0)
+        cache.set(PROJECT_REINDEX_KEY, index_name, PROJECT_REINDEX_TIMEOUT)
+        try:
+            indexed = 0
+            errors = 0
+            actions = self.iter_actions(index_name, options['chunk_size'], options['workers'])
+            for ok, info in parallel_bulk(es, actions, thread_count=options['threads'], raise_on_error=False):
+                if ok:
+                    indexed += 1
+                else:
+                    errors += 1
+                    self.stderr.write(f'Failed to index project: {info}')
+            if errors:
+                raise CommandError(f'Failed to index {errors} projects, {index_name} dropped and alias {alias} kept.')
+            try:
+                synced_seq, changed = self.sync_changes(index_name, synced_seq)
+            except CommandError as error:
+                raise CommandError(f'{error} {index_name} dropped and alias {alias} kept.')
+
+            es.indices.put_settings(
+                index=index_name,
+                body={'index': {
+                    'refresh_interval': '1s',
+                    'number_of_replicas': ProjectDocument._index._settings.get('number_of_replicas', 1),
+                }}
+            )
+            es.indices.refresh(index=index_name)
+
+            if es.indices.exists_alias(name=alias):
+                old_indices = list(es.indices.get_alias(name=alias))
+                actions = [{'remove': {'index': old_index, 'alias': alias}} for old_index in old_indices]
+            elif es.indices.exists(index=alias):
+                old_indices = []
+                actions = [{'remove_index': {'index': alias}}]
+            else:
+                old_indices = []
+                actions = []
+            actions.append({'add': {'index': index_name, 'alias': alias}})
+            es.indices.update_aliases(body={'actions': actions})
+        except BaseException:
+            cache.delete(PROJECT_REINDEX_KEY)
+            es.indices.delete(index=index_name, ignore_unavailable=True)
+            raise
+
+        cache.delete(PROJECT_REINDEX_KEY)
+        try:
+            _, changed_after_swap = self.sync_changes(index_name, synced_seq)
+        except CommandError as error:
+            raise CommandError(f'{error} Alias {alias} swapped to {index_name}, previous indices kept.')
+
+        if not options['keep_old']:
+            for old_index in old_indices:
+                es.indices.delete(index=old_index)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} projects into {index_name}, re-synced {changed + changed_after_swap} '
+            f'projects changed during the rebuild, alias {alias} swapped.'
+        ))
@@ -1,10 +1,98 @@
+import base64
+import binascii
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from elasticsearch_dsl import Response, Search
+from elasticsearch_dsl.connections import connections
+
+from .instrumentation import execute_search
+
+MAX_RESULT_WINDOW = getattr(settings, 'ES_MAX_RESULT_WINDOW', 10000)
+
+
+class SourceRelation(list):
+    """
+    Related objects of an indexed document, mimicking a related manager in templates.
+    """
+    def all(self):
+        return self
+
+
+class SourceProject:
+    """
+    Project rendered from the `_source` of an indexed document instead of a model instance.
+    """
+    def __init__(self, hit):
+        self._source = hit.to_dict()
+        self.pk = int(hit.meta.id)
+        self.technologies = SourceRelation(SimpleNamespace(**tag) for tag in self._source.get('technologies', []))
+        self.industries = SourceRelation(SimpleNamespace(**tag) for tag in self._source.get('industries', []))
+
+    def __getattr__(self, name: str):
+        try:
+            return self._source[name]
+        except KeyError:
+            raise AttributeError(name)
 
 
 class ElasticsearchQuerysetPaginator(Paginator):
     """
     Paginator class for ES.
+
+    Pages are rendered from the indexed documents; pass `hydrate=True` to load
+    model instances from the database instead. Page numbers are clamped to the last page
+    that fits into the `index.max_result_window` of the index.
     """
+    def __init__(self, *args, hydrate: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hydrate = hydrate
+        self.page_set = None
+        self.page_bottom = None
+
+    @cached_property
+    def count(self) -> int:
+        """
+        Return the total number of objects, taken from the executed page if there is one.
+        """
+        if self.page_set is not None:
+            return execute_search(self.page_set, 'project_page').hits.total.value
+        return super().count
+
+    @cached_property
+    def max_page(self) -> int:
+        """
+        Return the last page number whose hits fit into the max result window of the index.
+        """
+        return max(MAX_RESULT_WINDOW // self.per_page, 1)
+
+    def validate_number(self, number) -> int:
+        """
+        Validate the given 1-based page number and clamp it to the max result window.
+        """
+        return min(super().validate_number(number), self.max_page)
+
+    def execute_page(self, number: int) -> Response:
+        """
+        Execute the search for the given page before validating it, so the total count
+        and aggregations come back with the page hits in a single request. Out of range
+        numbers are clamped, so the slice never exceeds the max result window.
+
+        Args:
+            number (int): The 1-based page number to retrieve.
+
+        Returns:
+            Response: The Elasticsearch response for the page.
+
+        """
+        self.page_bottom = (min(max(number, 1), self.max_page) - 1) * self.per_page
+        self.page_set = self.object_list[self.page_bottom:self.page_bottom + self.per_page].extra(track_total_hits=True)
+        self.__dict__.pop('count', None)
+        return execute_search(self.page_set, 'project_page')
+
     def page(self, number: int):
         """
         Return a Page object for the given 1-based page number.
@@ -21,4 +109,183 @@ class ElasticsearchQuerysetPaginator(Paginator):
         top = bottom + self.per_page
         if top + self.orphans >= self.count:
             top = self.count
-        return self._get_page(self.object_list[bottom:top].to_queryset(), number, self)
\ No newline at end of file
+        if self.page_set is not None and bottom == self.page_bottom and top <= bottom + self.per_page:
+            return self._get_page(self.get_page_objects(self.page_set), number, self)
+        return self._get_page(self.get_page_objects(self.object_list[bottom:top]), number, self)
+
+    def get_page_objects(self, page_set: Search):
+        """
+        Return the objects of a page slice.
+
+        Args:
+            page_set (Search): The Elasticsearch query sliced to the page.
+
+        Returns:
+            QuerySet | list[SourceProject]: Model instances if hydrating, otherwise projects built from the hits.
+
+        """
+        if self.hydrate:
+            return page_set.to_queryset()
+        return [SourceProject(hit) for hit in execute_search(page_set, 'project_page')]
+
+
+class KeysetPage:
+    """
+    Page of a keyset paginator, exposing cursors instead of page numbers.
+    """
+    def __init__(self, object_list, response: Response, next_cursor: str | None, previous_cursor: str | None):
+        self.object_list = object_list
+        self.response = response
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class ElasticsearchKeysetPaginator:
+    """
+    Keyset paginator for ES based on `search_after`, so the cost of a page does not grow with its depth.
+
+    Cursors are opaque strings holding the sort values of the boundary hit, the direction and,
+    with `point_in_time=True`, the point in time the pages are read from.
+    """
+    def __init__(
+            self,
+            object_list: Search,
+            per_page: int,
+            sort: tuple[str, ...] = ('-_score', 'id'),
+            point_in_time: bool = False,
+            keep_alive: str = '1m',
+            hydrate: bool = False
+    ):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.sort = sort
+        self.point_in_time = point_in_time
+        self.keep_alive = keep_alive
+        self.hydrate = hydrate
+
+    @cached_property
+    def reverse_sort(self) -> tuple[str, ...]:
+        """
+        Return the sort order used to read pages backwards.
+        """
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.sort)
+
+    @staticmethod
+    def encode_cursor(position: dict) -> str:
+        """
+        Encode a page position into a cursor.
+
+        Args:
+            position (dict): Sort values of the boundary hit, direction and point in time ID.
+
+        Returns:
+            str: The cursor.
+
+        """
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> dict:
+        """
+        Decode a cursor into a page position, an invalid cursor points to the first page.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            dict: Sort values of the boundary hit, direction and point in time ID.
+
+        """
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (binascii.Error, UnicodeError, ValueError):
+            return dict()
+
+    def open_point_in_time(self) -> str:
+        """
+        Open a point in time on the searched index.
+
+        Returns:
+            str: The point in time ID.
+
+        """
+        es = connections.get_connection(self.object_list._using)
+        return es.open_point_in_time(
+            index=self.object_list._index,
+            keep_alive=self.keep_alive,
+            routing=self.object_list._params.get('routing'),
+        )['id']
+
+    def page(self, cursor: str | None = None) -> KeysetPage:
+        """
+        Return the page the cursor points to, or the first page without a cursor.
+
+        Args:
+            cursor (str): The cursor of the page.
+
+        Returns:
+            KeysetPage: A page with cursors of the next and previous pages.
+
+        """
+        position = self.decode_cursor(cursor) if cursor else dict()
+        reverse = position.get('reverse', False)
+
+        es_set = self.object_list.sort(*(self.reverse_sort if reverse else self.sort))[:self.per_page + 1]
+        if position.get('after'):
+            es_set = es_set.extra(search_after=position['after'])
+
+        pit_id = position.get('pit')
+        if self.point_in_time and not pit_id:
+            pit_id = self.open_point_in_time()
+        if pit_id:
+            es_set = es_set.index().params(routing=None).extra(pit={'id': pit_id, 'keep_alive': self.keep_alive})
+
+        response = execute_search(es_set, 'project_keyset_page')
+        pit_id = response.to_dict().get('pit_id', pit_id)
+        hits = list(response)
+        has_more = len(hits) > self.per_page
+        hits = hits[:self.per_page]
+        if reverse:
+            hits.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else bool(position.get('after'))
+        next_cursor = None
+        previous_cursor = None
+        if hits and has_next:
+            next_cursor = self.encode_cursor({'after': list(hits[-1].meta.sort), 'reverse': False, 'pit': pit_id})
+        if hits and has_previous:
+            previous_cursor = self.encode_cursor({'after': list(hits[0].meta.sort), 'reverse': True, 'pit': pit_id})
+
+        return KeysetPage(self.get_page_objects(hits), response, next_cursor, previous_cursor)
+
+    def get_page_objects(self, hits: list):
+        """
+        Return the objects of a page.
+
+        Args:
+            hits (list): The hits of the page in display order.
+
+        Returns:
+            list[Project] | list[SourceProject]: Model instances if hydrating, otherwise projects built from the hits.
+
+        """
+        if self.hydrate:
+            projects = self.object_list._model._default_manager.in_bulk([hit.meta.id for hit in hits])
+            return [projects[int(hit.meta.id)] for hit in hits if int(hit.meta.id) in projects]
+        return [SourceProject(hit) for hit in hits]
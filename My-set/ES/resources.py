@@ -1,8 +1,27 @@
+import csv
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import QuerySet
 from import_export import resources, fields
+from import_export.results import Result, RowResult
 from import_export.widgets import ManyToManyWidget, ForeignKeyWidget
 from .models import Project, Technology, Industry
+from .signals import projects_changed
+from .tasks import queue_project_index
+
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+IMPORT_VALUE_FIELDS = ('title', 'url', 'description', 'notes')
+
+
+class EchoBuffer:
+    """
+    File-like object that returns written values instead of buffering them.
+    """
+    def write(self, value: str) -> str:
+        return value
 
 
 class ProjectResource(resources.ModelResource):
@@ -48,7 +67,7 @@ class ProjectResource(resources.ModelResource):
 
     def filter_export(self, queryset: QuerySet, *args, **kwargs) -> QuerySet:
         """
-        Filter the queryset based on the project user.
+        Filter the queryset based on the project user and load exported relations up front.
 
         Args:
             queryset (QuerySet): The original queryset to filter.
@@ -58,6 +77,187 @@ class ProjectResource(resources.ModelResource):
         Returns:
             QuerySet: The filtered queryset.
         """
+        queryset = queryset.select_related('user').prefetch_related('technologies', 'industries')
         if self.project_user:
             return queryset.filter(user=self.project_user)
         return queryset
+
+    def iter_export_rows(self, queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Export the queryset row by row, loading projects in primary key chunks.
+
+        Args:
+            queryset (QuerySet): The queryset to export.
+            chunk_size (int): The number of projects loaded per chunk.
+
+        Yields:
+            list: The header row followed by a row per project.
+        """
+        queryset = self.filter_export(queryset).order_by('pk')
+        yield self.get_export_headers()
+
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1].pk
+            for project in chunk:
+                yield self.export_resource(project)
+
+    def stream_csv(self, queryset: QuerySet):
+        """
+        Export the queryset as CSV lines, to be sent with a StreamingHttpResponse.
+
+        Args:
+            queryset (QuerySet): The queryset to export.
+
+        Yields:
+            str: A CSV line.
+        """
+        writer = csv.writer(EchoBuffer())
+        for row in self.iter_export_rows(queryset):
+            yield writer.writerow(row)
+
+    def import_data(self, dataset, dry_run: bool = False, raise_errors: bool = False, **kwargs) -> Result:
+        """
+        Import the dataset, in bulk mode if `use_bulk` is passed.
+
+        Args:
+            dataset (Dataset): The dataset to import.
+            dry_run (bool): Whether to only count the changes without saving them.
+            raise_errors (bool): Whether to raise errors of row by row imports.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Result: The import result.
+        """
+        if kwargs.pop('use_bulk', False):
+            return self.bulk_import_data(dataset, dry_run=dry_run)
+        return super().import_data(dataset, dry_run=dry_run, raise_errors=raise_errors, **kwargs)
+
+    @staticmethod
+    def split_tag_names(value: str | None) -> list[str]:
+        """
+        Split a comma-separated tag cell into tag names.
+
+        Args:
+            value (str | None): The cell value.
+
+        Returns:
+            list[str]: Tag names.
+        """
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+    def bulk_import_data(self, dataset, dry_run: bool = False, batch_size: int = IMPORT_BATCH_SIZE) -> Result:
+        """
+        Import the dataset with batched queries instead of row by row.
+
+        Existing projects of the user are loaded in one query and tag names are resolved from
+        an in-memory map. Unknown tag names are ignored and unknown IDs create new projects,
+        matching ManyToManyWidget and the user scope of imports. Rows repeating an ID are merged
+        into the last of them, as it is the one a row by row import leaves in place; the earlier
+        ones are reported as skipped.
+
+        Args:
+            dataset (Dataset): The dataset to import.
+            dry_run (bool): Whether to only count the changes without saving them.
+            batch_size (int): The number of objects per bulk query.
+
+        Returns:
+            Result: The import result with new, update and skip totals.
+        """
+        result = Result()
+        result.total_rows = len(dataset)
+        rows = []
+        row_indexes = dict()
+        for row in dataset.dict:
+            row_id = str(row.get('id') or '')
+            if row_id.isdigit() and int(row_id) in row_indexes:
+                rows[row_indexes[int(row_id)]] = row
+                result.totals[RowResult.IMPORT_TYPE_SKIP] += 1
+                continue
+            if row_id.isdigit():
+                row_indexes[int(row_id)] = len(rows)
+            rows.append(row)
+
+        existing = {
+            project.pk: project
+            for project in Project.objects.filter(user=self.project_user).prefetch_related('technologies', 'industries')
+        }
+        technology_names = {name for row in rows for name in self.split_tag_names(row.get('technologies'))}
+        industry_names = {name for row in rows for name in self.split_tag_names(row.get('industries'))}
+        technologies = dict(Technology.objects.filter(name__in=technology_names).values_list('name', 'pk'))
+        industries = dict(Industry.objects.filter(name__in=industry_names).values_list('name', 'pk'))
+
+        new_projects = []
+        updated_projects = []
+        project_tags = []
+        changed_projects = []
+        for row in rows:
+            values = {field: row.get(field) or '' for field in IMPORT_VALUE_FIELDS}
+            technology_ids = {technologies[name] for name in self.split_tag_names(row.get('technologies')) if name in technologies}
+            industry_ids = {industries[name] for name in self.split_tag_names(row.get('industries')) if name in industries}
+
+            project = existing.get(int(row['id'])) if str(row.get('id') or '').isdigit() else None
+            if project is None:
+                project = Project(user=self.project_user, **values)
+                new_projects.append(project)
+                project_tags.append((project, technology_ids, industry_ids))
+                result.totals[RowResult.IMPORT_TYPE_NEW] += 1
+                continue
+
+            values_changed = any(getattr(project, field) != value for field, value in values.items())
+            tags_changed = (
+                technology_ids != {technology.pk for technology in project.technologies.all()}
+                or industry_ids != {industry.pk for industry in project.industries.all()}
+            )
+            if not values_changed and not tags_changed:
+                result.totals[RowResult.IMPORT_TYPE_SKIP] += 1
+                continue
+
+            changed_projects.append((project.pk, project.user_id, project.url))
+            for field, value in values.items():
+                setattr(project, field, value)
+            if values_changed:
+                updated_projects.append(project)
+            if tags_changed:
+                project_tags.append((project, technology_ids, industry_ids))
+            result.totals[RowResult.IMPORT_TYPE_UPDATE] += 1
+
+        if dry_run:
+            return result
+
+        with transaction.atomic():
+            Project.objects.bulk_create(new_projects, batch_size=batch_size)
+            Project.objects.bulk_update(updated_projects, IMPORT_VALUE_FIELDS, batch_size=batch_size)
+
+            retagged_ids = [project.pk for project, _, _ in project_tags if project.pk in existing]
+            Project.technologies.through.objects.filter(project_id__in=retagged_ids).delete()
+            Project.industries.through.objects.filter(project_id__in=retagged_ids).delete()
+            Project.technologies.through.objects.bulk_create(
+                [
+                    Project.technologies.through(project_id=project.pk, technology_id=technology_id)
+                    for project, technology_ids, _ in project_tags
+                    for technology_id in technology_ids
+                ],
+                batch_size=batch_size
+            )
+            Project.industries.through.objects.bulk_create(
+                [
+                    Project.industries.through(project_id=project.pk, industry_id=industry_id)
+                    for project, _, industry_ids in project_tags
+                    for industry_id in industry_ids
+                ],
+                batch_size=batch_size
+            )
+
+            touched = {project.pk: project.user_id for project in new_projects + updated_projects}
+            touched.update((project.pk, project.user_id) for project, _, _ in project_tags)
+            transaction.on_commit(lambda: queue_project_index(touched))
+            changed_projects.extend(
+                (project.pk, project.user_id, project.url) for project in new_projects + updated_projects
+            )
+            transaction.on_commit(lambda: projects_changed.send(sender=Project, projects=changed_projects))
+
+        return result
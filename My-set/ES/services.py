@@ -1,4 +1,28 @@
-from elasticsearch_dsl import Search, Response
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from elasticsearch_dsl import A, MultiSearch, Q, Search, Response
+
+from .instrumentation import execute_multi_search, execute_search
+
+
+FACET_CACHE_TIMEOUT = 60 * 60
+FACET_PAGE_SIZE = 1000
+SUGGEST_CACHE_TIMEOUT = 30
+SUGGEST_SIZE = 10
+SUGGEST_FIELDS = [
+    'title.suggest',
+    'title.suggest._2gram',
+    'title.suggest._3gram',
+    'technologies.name.suggest',
+    'industries.name.suggest',
+]
+FACET_FIELDS = {
+    'technologies': 'technologies.name.keyword',
+    'industries': 'industries.name.keyword',
+}
 
 
 class ProjectListService:
@@ -102,15 +126,182 @@ class ProjectListService:
             tuple[dict, dict]: A tuple containing dictionaries for technologies and industries.
 
         """
-        response = es_set.execute()
+        response = execute_search(es_set, 'project_aggregations')
         technologies = cls.get_technology_dict(response)
         industries = cls.get_industry_dict(response)
         return technologies, industries
 
+    @classmethod
+    def get_tag_queries(cls, industries_filter: list[str], technologies_filter: list[str]) -> tuple[Q, Q]:
+        """
+        Builds queries for the selected industries and for all selected tags.
+
+        Args:
+            industries_filter (list[str]): Selected industries.
+            technologies_filter (list[str]): Selected technologies.
+
+        Returns:
+            tuple[Q, Q]: A tuple containing the industries query and the query of both tag filters.
+
+        """
+        industries_query = Q('match_all')
+        if industries_filter:
+            industries_query = Q('terms', industries__name__keyword=industries_filter)
+        tags_query = industries_query
+        if technologies_filter:
+            tags_query = industries_query & Q('terms', technologies__name__keyword=technologies_filter)
+        return industries_query, tags_query
+
+    @classmethod
+    def get_composite_aggregation(cls, field: str, after: dict | None = None) -> A:
+        """
+        Builds a page of a composite aggregation over a keyword field.
+
+        Args:
+            field (str): The keyword field to aggregate.
+            after (dict | None): The `after_key` of the previous page.
+
+        Returns:
+            A: The composite aggregation.
+
+        """
+        params = {'sources': [{'tag': {'terms': {'field': field}}}], 'size': FACET_PAGE_SIZE}
+        if after:
+            params['after'] = after
+        return A('composite', **params)
+
+    @classmethod
+    def execute_facet_searches(cls, facet_searches: dict[str, tuple[Search, tuple[str, ...]]]) -> dict:
+        """
+        Collects every bucket of the facets of each search, paging composite aggregations
+        of all searches together in one multi-search per page.
+
+        Args:
+            facet_searches (dict): Searches and the facets to collect from them, by search name.
+
+        Returns:
+            dict: Bucket counts by tag, by facet, by search name.
+
+        """
+        results = {name: {facet: dict() for facet in facets} for name, (_, facets) in facet_searches.items()}
+        pending = {(name, facet): None for name, (_, facets) in facet_searches.items() for facet in facets}
+        first_search = next(iter(facet_searches.values()))[0]
+
+        while pending:
+            multi_search = MultiSearch(using=first_search._using)
+            names = []
+            for name, (es_set, _) in facet_searches.items():
+                page_facets = [(facet, after) for (search_name, facet), after in pending.items() if search_name == name]
+                if not page_facets:
+                    continue
+                es_set = es_set.extra(size=0)
+                for facet, after in page_facets:
+                    es_set.aggs.bucket(facet, cls.get_composite_aggregation(FACET_FIELDS[facet], after))
+                multi_search = multi_search.add(es_set)
+                names.append(name)
+
+            for name, response in zip(names, execute_multi_search(multi_search, 'project_facets')):
+                for facet in results[name]:
+                    if (name, facet) not in pending:
+                        continue
+                    aggregation = getattr(response.aggs, facet)
+                    buckets = results[name][facet]
+                    for bucket in aggregation.buckets:
+                        buckets[bucket.key.tag] = bucket.doc_count
+                    if len(aggregation.buckets) == FACET_PAGE_SIZE and 'after_key' in aggregation:
+                        pending[(name, facet)] = aggregation.after_key.to_dict()
+                    else:
+                        del pending[(name, facet)]
+
+        return results
+
+    @classmethod
+    def get_facets(
+            cls,
+            base_set: Search,
+            es_set: Search,
+            industries_filter: list[str],
+            technologies_filter: list[str]
+    ) -> tuple[dict, dict]:
+        """
+        Computes technology and industry facets of the sidebar.
+
+        Facet searches:
+            initial: all facets of the unfiltered project set, ordered by count.
+            active_technologies: technology facets with the industries filter applied.
+            active_industries: industry facets with both tag filters applied if technologies are filtered,
+                otherwise with search only, so other industries keep their counts.
+            filtered: facets with both tag filters applied.
+
+        Args:
+            base_set (Search): The Elasticsearch query of the unfiltered project set.
+            es_set (Search): The Elasticsearch query with search applied.
+            industries_filter (list[str]): Selected industries.
+            technologies_filter (list[str]): Selected technologies.
+
+        Returns:
+            tuple[dict, dict]: A tuple containing formatted dictionaries for technologies and industries.
+
+        """
+        industries_query, tags_query = cls.get_tag_queries(industries_filter, technologies_filter)
+        results = cls.execute_facet_searches({
+            'initial': (base_set, ('technologies', 'industries')),
+            'active_technologies': (es_set.filter(industries_query), ('technologies',)),
+            'active_industries': (es_set.filter(tags_query) if technologies_filter else es_set, ('industries',)),
+            'filtered': (es_set.filter(tags_query), ('technologies', 'industries')),
+        })
+
+        initial = {
+            facet: dict(sorted(buckets.items(), key=lambda item: -item[1]))
+            for facet, buckets in results['initial'].items()
+        }
+        initial_technologies = cls.get_active_dict_items(
+            initial['technologies'], results['active_technologies']['technologies']
+        )
+        initial_industries = cls.get_active_dict_items(
+            initial['industries'], results['active_industries']['industries']
+        )
+
+        technologies = cls.confirm_dicts_with_items(initial_technologies, results['filtered']['technologies'])
+        industries = cls.confirm_dicts_with_items(initial_industries, results['filtered']['industries'])
+        return technologies, industries
+
+    @classmethod
+    def get_suggestions(cls, es_set: Search, user_id: int, query: str) -> list[dict]:
+        """
+        Returns projects whose title or tags start with the typed query, for type-ahead.
+
+        Suggestions are cached briefly per user and index generation, so repeated
+        keystrokes do not reach Elasticsearch.
+
+        Args:
+            es_set (Search): The Elasticsearch query of the user's projects.
+            user_id (int): The ID of the user.
+            query (str): The typed query.
+
+        Returns:
+            list[dict]: IDs and titles of the suggested projects.
+
+        """
+        query = query.strip().lower()
+        cache_key = 'project_suggest:{}:{}:{}'.format(
+            user_id,
+            FacetCacheService.get_generation(user_id),
+            hashlib.md5(query.encode('utf-8')).hexdigest()
+        )
+        suggestions = cache.get(cache_key)
+        if suggestions is None:
+            suggest_set = es_set.query(
+                'multi_match', query=query, type='bool_prefix', fields=SUGGEST_FIELDS
+            ).source(['id', 'title'])[:SUGGEST_SIZE]
+            suggestions = [{'id': hit.id, 'title': hit.title} for hit in execute_search(suggest_set, 'project_suggest')]
+            cache.set(cache_key, suggestions, timeout=SUGGEST_CACHE_TIMEOUT)
+        return suggestions
+
     @classmethod
     def sort_items_by_the_list(cls, items: dict, string_list: list[str]) -> dict:
         """
-        Sorts items based on the given list.
+        Sorts items based on the given list, moving items present in the list to the front.
 
         Args:
             items (dict): The dictionary to be sorted.
@@ -120,5 +311,103 @@ class ProjectListService:
             dict: A sorted dictionary.
 
         """
-        return dict(sorted(items.items(), key=lambda x: (x[0] not in string_list)))
+        strings = set(string_list)
+        sorted_items = {item: value for item, value in items.items() if item in strings}
+        sorted_items.update((item, value) for item, value in items.items() if item not in strings)
+        return sorted_items
 
+
+class FacetCacheService:
+
+    @classmethod
+    def get_generation_key(cls, user_id: int) -> str:
+        """
+        Returns the cache key of the user's projects index generation.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The cache key.
+
+        """
+        return f'project_facets_generation:{user_id}'
+
+    @classmethod
+    def get_generation(cls, user_id: int) -> int:
+        """
+        Returns the generation of the user's projects in the index.
+
+        The generation is seeded with the current time, so an evicted counter never
+        revives facets cached under an earlier generation.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int: The index generation.
+
+        """
+        generation_key = cls.get_generation_key(user_id)
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, time.time_ns(), timeout=None)
+            generation = cache.get(generation_key)
+        return generation
+
+    @classmethod
+    def bump_generation(cls, user_id: int) -> None:
+        """
+        Invalidates cached facets of the user by bumping the index generation.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        """
+        try:
+            cache.incr(cls.get_generation_key(user_id))
+        except ValueError:
+            cache.set(cls.get_generation_key(user_id), time.time_ns(), timeout=None)
+
+    @classmethod
+    def get_cache_key(cls, user_id: int, **filters) -> str:
+        """
+        Returns the facet cache key for the user's filter set at the current index generation.
+
+        Args:
+            user_id (int): The ID of the user.
+            **filters: The filter set, e.g. search, is_public, industries and technologies.
+
+        Returns:
+            str: The cache key.
+
+        """
+        filters_hash = hashlib.md5(json.dumps(filters, sort_keys=True).encode('utf-8')).hexdigest()
+        return f'project_facets:{user_id}:{cls.get_generation(user_id)}:{filters_hash}'
+
+    @classmethod
+    def get_facets(cls, cache_key: str) -> tuple[dict, dict] | None:
+        """
+        Returns cached technology and industry facets.
+
+        Args:
+            cache_key (str): The facet cache key.
+
+        Returns:
+            tuple[dict, dict] | None: Cached technologies and industries, or None on a cache miss.
+
+        """
+        return cache.get(cache_key)
+
+    @classmethod
+    def set_facets(cls, cache_key: str, technologies: dict, industries: dict) -> None:
+        """
+        Caches technology and industry facets.
+
+        Args:
+            cache_key (str): The facet cache key.
+            technologies (dict): Formatted technology facets.
+            industries (dict): Formatted industry facets.
+
+        """
+        cache.set(cache_key, (technologies, industries), timeout=FACET_CACHE_TIMEOUT)
@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+
+from .models import Project
+from .tasks import queue_project_index
+
+# Sent after commit with `projects`, IDs, user IDs and URLs of projects whose tags changed or
+# which were changed in bulk, so other apps do not resolve them again.
+projects_changed = Signal()
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance: Project, **kwargs) -> None:
+    """
+    Signal handler queueing a saved or deleted project for indexing.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The instance of the Project model.
+        kwargs: Additional keyword arguments.
+    """
+    projects = {instance.pk: instance.user_id}
+    transaction.on_commit(lambda: queue_project_index(projects))
+
+
+def get_changed_projects(sender, instance, action: str, reverse: bool, pk_set: set) -> list[tuple] | None:
+    """
+    Resolve projects whose technologies or industries are changed by an m2m_changed signal.
+
+    For reverse clears the projects are looked up on `pre_clear` and kept on the tag instance
+    until `post_clear`, as the relations no longer exist then.
+
+    Args:
+        sender: The through model of the changed relation.
+        instance: The instance of the Project model, or of the tag model for reverse changes.
+        action: The type of the m2m change.
+        reverse: Whether the change was made from the tag side.
+        pk_set: Primary keys of the added or removed objects.
+
+    Returns:
+        list[tuple] | None: IDs, user IDs and URLs of the changed projects,
+        or None if the action does not change them.
+    """
+    if action not in ('pre_clear', 'post_add', 'post_remove', 'post_clear'):
+        return None
+    if not reverse:
+        if action == 'pre_clear':
+            return None
+        return [(instance.pk, instance.user_id, instance.url)]
+    if action == 'pre_clear':
+        tag_field = 'technologies' if sender is Project.technologies.through else 'industries'
+        instance._cleared_projects = list(
+            Project.objects.filter(**{tag_field: instance.pk}).values_list('pk', 'user_id', 'url')
+        )
+        return None
+    if action == 'post_clear':
+        return instance.__dict__.pop('_cleared_projects', list())
+    return list(Project.objects.filter(pk__in=pk_set).values_list('pk', 'user_id', 'url'))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+@receiver(m2m_changed, sender=Project.industries.through)
+def project_tags_changed(sender, instance, action: str, reverse: bool, pk_set: set, **kwargs) -> None:
+    """
+    Signal handler queueing projects whose technologies or industries changed for indexing.
+
+    Changed projects are resolved once and passed on with `projects_changed`.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The instance of the Project model, or of the tag model for reverse changes.
+        action: The type of the m2m change.
+        reverse: Whether the change was made from the tag side.
+        pk_set: Primary keys of the added or removed objects.
+        kwargs: Additional keyword arguments.
+    """
+    changed_projects = get_changed_projects(sender, instance, action, reverse, pk_set)
+    if changed_projects is None:
+        return
+    projects = {project_id: user_id for project_id, user_id, _ in changed_projects}
+    transaction.on_commit(lambda: queue_project_index(projects))
+    transaction.on_commit(lambda: projects_changed.send(sender=Project, projects=changed_projects))
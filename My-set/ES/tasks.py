@@ -0,0 +1,165 @@
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from elasticsearch.helpers import bulk
+from elasticsearch_dsl.connections import connections
+
+from .documents import ProjectDocument
+from .models import Project
+from .services import FacetCacheService
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_INDEX_DEBOUNCE = 5
+PROJECT_INDEX_QUEUE_TIMEOUT = 60 * 10
+PROJECT_INDEX_SEQ_KEY = 'project_index_seq'
+PROJECT_INDEX_FLUSHED_KEY = 'project_index_flushed'
+PROJECT_INDEX_FLUSH_SCHEDULED_KEY = 'project_index_flush_scheduled'
+PROJECT_INDEX_PENDING_KEY = 'project_index_pending:{project_id}'
+PROJECT_INDEX_QUEUE_KEY = 'project_index_queue:{seq}'
+PROJECT_REINDEX_TIMEOUT = 60 * 60 * 24
+PROJECT_REINDEX_KEY = 'project_reindex_in_progress'
+PROJECT_REINDEX_SEQ_KEY = 'project_reindex_seq'
+PROJECT_REINDEX_CHANGES_KEY = 'project_reindex_changes:{seq}'
+
+suspended_project_index = contextvars.ContextVar('suspended_project_index', default=None)
+
+
+@contextmanager
+def suspend_project_index():
+    """
+    Suspend indexing of projects, collecting projects queued in the block instead.
+
+    The caller is responsible for syncing the collected projects, usually once with
+    `sync_projects_index` after a bulk operation.
+
+    Yields:
+        dict[int, int]: User IDs by ID of the projects queued while indexing is suspended.
+
+    """
+    projects = dict()
+    token = suspended_project_index.set(projects)
+    try:
+        yield projects
+    finally:
+        suspended_project_index.reset(token)
+
+
+def queue_project_index(projects: dict[int, int]) -> None:
+    """
+    Queue projects for indexing, coalescing changes of a project until the next flush.
+
+    A project is marked pending only after its queue entry is stored, so an entry missing from
+    the queue never leaves a pending mark that would drop later changes of the project.
+
+    Args:
+        projects (dict[int, int]): User IDs by ID of changed or deleted projects.
+
+    """
+    suspended_projects = suspended_project_index.get()
+    if suspended_projects is not None:
+        suspended_projects.update(projects)
+        return
+
+    for project_id, user_id in projects.items():
+        pending_key = PROJECT_INDEX_PENDING_KEY.format(project_id=project_id)
+        if cache.get(pending_key):
+            continue
+        cache.add(PROJECT_INDEX_SEQ_KEY, 0, timeout=None)
+        seq = cache.incr(PROJECT_INDEX_SEQ_KEY)
+        cache.set(PROJECT_INDEX_QUEUE_KEY.format(seq=seq), (project_id, user_id), PROJECT_INDEX_QUEUE_TIMEOUT)
+        cache.set(pending_key, 1, PROJECT_INDEX_QUEUE_TIMEOUT)
+
+    if cache.add(PROJECT_INDEX_FLUSH_SCHEDULED_KEY, 1, PROJECT_INDEX_DEBOUNCE):
+        flush_project_index.apply_async(countdown=PROJECT_INDEX_DEBOUNCE)
+
+
+def record_reindex_changes(projects: dict[int, int]) -> None:
+    """
+    Record projects synced while the index is being rebuilt, so the rebuild can re-sync them before the swap.
+
+    Args:
+        projects (dict[int, int]): User IDs by ID of changed or deleted projects.
+
+    """
+    if not cache.get(PROJECT_REINDEX_KEY):
+        return
+    cache.add(PROJECT_REINDEX_SEQ_KEY, 0, timeout=None)
+    seq = cache.incr(PROJECT_REINDEX_SEQ_KEY)
+    cache.set(PROJECT_REINDEX_CHANGES_KEY.format(seq=seq), projects, PROJECT_REINDEX_TIMEOUT)
+
+
+def sync_projects_index(projects: dict[int, int]) -> None:
+    """
+    Bulk index the current state of projects, deleting documents of projects that no longer exist.
+
+    Args:
+        projects (dict[int, int]): User IDs by project ID.
+
+    """
+    record_reindex_changes(projects)
+    instances = list(
+        Project.objects.filter(pk__in=list(projects)).prefetch_related('technologies', 'industries')
+    )
+    if instances:
+        ProjectDocument().update(instances)
+
+    deleted = dict(projects)
+    for instance in instances:
+        deleted.pop(instance.pk, None)
+    if deleted:
+        actions = [
+            {'_op_type': 'delete', '_index': ProjectDocument._index._name, '_id': project_id, '_routing': user_id}
+            for project_id, user_id in deleted.items()
+        ]
+        bulk(connections.get_connection(), actions, raise_on_error=False)
+        for user_id in set(deleted.values()):
+            FacetCacheService.bump_generation(user_id)
+
+
+@app.task(bind=True, max_retries=5)
+def flush_project_index(self) -> int:
+    """
+    Task to flush queued project changes to Elasticsearch as one bulk request.
+
+    Queue entries are read in sequence order. If an entry is missing because its producer has
+    not stored it yet, the flush stops before it and retries, skipping gaps on the last attempt.
+    The flushed sequence is committed and entries are deleted only after the sync succeeds;
+    indexing errors are retried with exponential backoff.
+
+    Returns:
+        int: The number of synced projects.
+
+    """
+    last_seq = cache.get(PROJECT_INDEX_SEQ_KEY, 0)
+    first_seq = cache.get(PROJECT_INDEX_FLUSHED_KEY, 0) + 1
+    keys = [PROJECT_INDEX_QUEUE_KEY.format(seq=seq) for seq in range(first_seq, last_seq + 1)]
+    queued = cache.get_many(keys)
+
+    flushed_seq = last_seq
+    retry = False
+    if len(queued) < len(keys) and self.request.retries < self.max_retries:
+        missing_seq = next(seq for seq, key in zip(range(first_seq, last_seq + 1), keys) if key not in queued)
+        keys = keys[:missing_seq - first_seq]
+        flushed_seq = missing_seq - 1
+        retry = True
+
+    projects = dict(queued[key] for key in keys if key in queued)
+    # Changes committed from now on must be queued again, as the sync may read the database before them.
+    cache.delete_many([PROJECT_INDEX_PENDING_KEY.format(project_id=project_id) for project_id in projects])
+
+    if projects:
+        try:
+            sync_projects_index(projects)
+        except Exception as exc:
+            raise self.retry(exc=exc, countdown=PROJECT_INDEX_DEBOUNCE * 2 ** self.request.retries)
+
+    if flushed_seq > cache.get(PROJECT_INDEX_FLUSHED_KEY, 0):
+        cache.set(PROJECT_INDEX_FLUSHED_KEY, flushed_seq, timeout=None)
+    cache.delete_many(keys)
+    if retry:
+        raise self.retry(countdown=PROJECT_INDEX_DEBOUNCE)
+    return len(projects)
@@ -1,8 +1,11 @@
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.core.paginator import EmptyPage
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from elasticsearch_dsl import A
+from django.views.decorators.http import require_POST
+from elasticsearch_dsl import Q
+from tablib import Dataset
 
 
 @login_required
@@ -15,47 +18,43 @@ def project_list(request):
     technologies_filter = request.GET.getlist('technologies')
     is_public = request.GET.get('is_public', False)
     set_id = request.GET.get('set_id')
+    cursor = request.GET.get('cursor')
 
-    result_set = ProjectDocument.search().filter('term', user__id=request.user.id)
+    base_filter = Q('term', user__id=request.user.id)
     if is_public:
-        result_set = result_set.filter('term', is_public=True)
-
-    technology_agg = A('terms', field='technologies.name.keyword')
-    result_set.aggs.bucket('technologies', technology_agg)
-
-    industry_agg = A('terms', field='industries.name.keyword')
-    result_set.aggs.bucket('industries', industry_agg)
-
-    initial_technologies, initial_industries = ProjectListService.get_aggregation_results(result_set)
+        base_filter &= Q('term', is_public=True)
 
+    base_set = ProjectDocument.user_search(request.user.id).filter(base_filter)
+    result_set = base_set
     if search:
         result_set = result_set.filter('multi_match', query=search, fields=['title', 'description'])
-        technologies, industries = ProjectListService.get_aggregation_results(result_set)
-        initial_technologies = ProjectListService.get_active_dict_items(initial_technologies, technologies)
-        initial_industries = ProjectListService.get_active_dict_items(initial_industries, industries)
-
-    if industries_filter:
-        result_set = result_set.filter('terms', industries__name__keyword=industries_filter)
-        technologies, _ = ProjectListService.get_aggregation_results(result_set)
-        initial_technologies = ProjectListService.get_active_dict_items(initial_technologies, technologies)
-
-    if technologies_filter:
-        result_set = result_set.filter('terms', technologies__name__keyword=technologies_filter)
-        _, industries = ProjectListService.get_aggregation_results(result_set)
-        initial_industries = ProjectListService.get_active_dict_items(initial_industries, industries)
-
-    filtered_technologies, filtered_industries = ProjectListService.get_aggregation_results(result_set)
-
-    technologies = ProjectListService.confirm_dicts_with_items(initial_technologies, filtered_technologies)
-    industries = ProjectListService.confirm_dicts_with_items(initial_industries, filtered_industries)
+    facets_cache_key = FacetCacheService.get_cache_key(
+        request.user.id,
+        search=search,
+        is_public=bool(is_public),
+        industries=sorted(industries_filter),
+        technologies=sorted(technologies_filter),
+    )
+    facets = FacetCacheService.get_facets(facets_cache_key)
+    if facets is None:
+        facets = ProjectListService.get_facets(base_set, result_set, industries_filter, technologies_filter)
+        FacetCacheService.set_facets(facets_cache_key, *facets)
+    technologies, industries = facets
 
-    elasticsearch_paginator = ElasticsearchQuerysetPaginator(result_set, items_per_page)
-    page = int(request.GET.get('page', 1))
+    _, tags_query = ProjectListService.get_tag_queries(industries_filter, technologies_filter)
+    result_set = result_set.filter(tags_query)
 
-    try:
-        projects = elasticsearch_paginator.page(page)
-    except EmptyPage:
-        projects = elasticsearch_paginator.page(elasticsearch_paginator.num_pages)
+    if cursor is not None:
+        elasticsearch_paginator = ElasticsearchKeysetPaginator(result_set, items_per_page)
+        projects = elasticsearch_paginator.page(cursor)
+    else:
+        elasticsearch_paginator = ElasticsearchQuerysetPaginator(result_set, items_per_page)
+        page = int(request.GET.get('page', 1))
+        elasticsearch_paginator.execute_page(page)
+        try:
+            projects = elasticsearch_paginator.page(page)
+        except EmptyPage:
+            projects = elasticsearch_paginator.page(elasticsearch_paginator.num_pages)
 
     data = {
         "projects": projects,
@@ -67,6 +66,65 @@ def project_list(request):
         'page_size': page_size,
         'is_public': is_public,
     }
+    if cursor is not None:
+        data.update({"next_cursor": projects.next_cursor, "previous_cursor": projects.previous_cursor})
     if set_id:
         data.update({"set_id": set_id})
     return render(request, 'project_list.html', data)
+
+
+@login_required
+def project_suggest(request):
+    """
+    Type-ahead suggestions for the project search box.
+
+    GET request should include the typed text as `q`.
+
+    Returns:
+        JsonResponse: IDs and titles of the suggested projects.
+
+    """
+    query = request.GET.get('q', '')
+    if len(query.strip()) < 2:
+        return JsonResponse({'results': []})
+
+    es_set = ProjectDocument.user_search(request.user.id).filter('term', user__id=request.user.id)
+    suggestions = ProjectListService.get_suggestions(es_set, request.user.id, query)
+    return JsonResponse({'results': suggestions})
+
+
+@login_required
+def export_projects(request):
+    """
+    Stream the user's projects as a CSV file.
+
+    Returns:
+        StreamingHttpResponse: The CSV file response.
+
+    """
+    resource = ProjectResource(project_user=request.user)
+    response = StreamingHttpResponse(resource.stream_csv(Project.objects.all()), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="projects.csv"'
+    return response
+
+
+@login_required
+@require_POST
+def import_projects(request):
+    """
+    Import the user's projects from an uploaded CSV file in bulk mode.
+
+    Passing `dry_run` only counts the changes without saving them.
+
+    Returns:
+        JsonResponse: Numbers of new, updated and skipped projects.
+
+    """
+    csv_file = request.FILES.get('import_file')
+    if csv_file is None:
+        return JsonResponse({'error': 'import_file is required'}, status=400)
+
+    dataset = Dataset().load(csv_file.read().decode('utf-8'), format='csv')
+    resource = ProjectResource(project_user=request.user)
+    result = resource.import_data(dataset, dry_run=bool(request.POST.get('dry_run')), use_bulk=True)
+    return JsonResponse(dict(result.totals))